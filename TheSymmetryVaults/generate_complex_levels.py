@@ -22,6 +22,7 @@ import json
 import math
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -519,7 +520,7 @@ class AutomorphismFinder:
 
         if n > 12:
             print(f"WARNING: Graph has {n} nodes. Brute-force automorphism search "
-                  f"may be very slow (n! = {math.factorial(n)}).", file=sys.stderr)
+                  f"may be very slow (n! = {_factorial(n)}).", file=sys.stderr)
 
         # Build adjacency with edge types for fast lookup
         adj: dict[tuple[int, int], str] = {}
@@ -643,6 +644,20 @@ class AutomorphismFinder:
 # Group generators (abstract groups, independent of graphs)
 # ============================================================================
 
+# n! for n = 0..20 (20! is the largest that fits in 64 bits)
+_FACT = tuple(math.factorial(n) for n in range(21))
+
+
+def _factorial(n: int) -> int:
+    return _FACT[n] if n < len(_FACT) else math.factorial(n)
+
+
+@lru_cache(maxsize=None)
+def _all_permutations(n: int) -> tuple[tuple[int, ...], ...]:
+    """Every permutation of range(n) in lexicographic order, built once per n."""
+    return tuple(itertools.permutations(range(n)))
+
+
 class GroupGenerator:
     """Generate well-known groups as sets of permutations."""
 
@@ -675,17 +690,17 @@ class GroupGenerator:
         """Symmetric group S_n: all permutations of n elements.
         Order = n!"""
         if n > 7:
-            raise ValueError(f"S_{n} has {math.factorial(n)} elements, too large")
-        return [Permutation(list(p)) for p in itertools.permutations(range(n))]
+            raise ValueError(f"S_{n} has {_factorial(n)} elements, too large")
+        return [Permutation(list(p)) for p in _all_permutations(n)]
 
     @staticmethod
     def alternating(n: int) -> list[Permutation]:
         """Alternating group A_n: even permutations of n elements.
         Order = n!/2"""
         if n > 7:
-            raise ValueError(f"A_{n} has {math.factorial(n) // 2} elements, too large")
+            raise ValueError(f"A_{n} has {_factorial(n) // 2} elements, too large")
         result = []
-        for p_tuple in itertools.permutations(range(n)):
+        for p_tuple in _all_permutations(n):
             p = Permutation(list(p_tuple))
             if _perm_sign(p) == 1:
                 result.append(p)
@@ -883,6 +898,11 @@ def _is_normal_subgroup(
     full_set: set[tuple[int, ...]]
 ) -> bool:
     """Check if subgroup is normal: gHg^{-1} = H for all g."""
+    # Trivial subgroup, the whole group and index-2 subgroups are always
+    # normal -- skip the conjugation sweep for them.
+    order, group_order = len(subgroup), len(full_group)
+    if order in (1, group_order) or group_order == 2 * order:
+        return True
     sg_set = {tuple(p.mapping) for p in subgroup}
     for g in full_group:
         g_inv = g.inverse()
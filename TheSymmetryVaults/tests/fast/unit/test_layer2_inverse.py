@@ -1217,16 +1217,15 @@ class TestKeyPressBasedPairDetection(unittest.TestCase):
 
     def _build_cayley_table(self, perms: list[Permutation]) -> list[list[int]]:
         """Build Cayley table matching RoomState convention: table[a][b] = a*b."""
-        n = len(perms)
+        # a*b in math = b.compose(a), i.e. a's mapping gathered by b's --
+        # computed on raw tuples without building Permutation objects.
+        maps = [tuple(p.mapping) for p in perms]
+        index_of = {m: k for k, m in enumerate(maps)}
         table = []
-        for a in range(n):
-            row = [0] * n
-            for b in range(n):
-                product = perms[b].compose(perms[a])  # a*b in math = b.compose(a)
-                for k in range(n):
-                    if perms[k].equals(product):
-                        row[b] = k
-                        break
+        for am in maps:
+            row = []
+            for bm in maps:
+                row.append(index_of.get(tuple(am[x] for x in bm), 0))
             table.append(row)
         return table
 
@@ -1321,16 +1320,15 @@ class TestKeyPressFromAnyRoom(unittest.TestCase):
     Two consecutive key presses that return to the SAME starting room = pair."""
 
     def _build_cayley_table(self, perms: list[Permutation]) -> list[list[int]]:
-        n = len(perms)
+        # a*b in math = b.compose(a), i.e. a's mapping gathered by b's --
+        # computed on raw tuples without building Permutation objects.
+        maps = [tuple(p.mapping) for p in perms]
+        index_of = {m: k for k, m in enumerate(maps)}
         table = []
-        for a in range(n):
-            row = [0] * n
-            for b in range(n):
-                product = perms[b].compose(perms[a])
-                for k in range(n):
-                    if perms[k].equals(product):
-                        row[b] = k
-                        break
+        for am in maps:
+            row = []
+            for bm in maps:
+                row.append(index_of.get(tuple(am[x] for x in bm), 0))
             table.append(row)
         return table
 
@@ -9,10 +9,14 @@ Verifies:
 - Node size scales by room count
 - BFS distances are correct
 """
+import itertools
 import json
 import math
 import os
 import unittest
+from collections import deque
+from functools import lru_cache
+from typing import Optional
 
 
 # === Python mirror of layout algorithm (matches room_map_panel.gd) ===
@@ -25,12 +29,10 @@ class LayoutEngine:
         """BFS from room 0 using all non-identity keys."""
         dist = [999] * n
         dist[0] = 0
-        queue = [0]
+        queue = deque([0])
         visited = {0}
-        qi = 0
-        while qi < len(queue):
-            v = queue[qi]
-            qi += 1
+        while queue:
+            v = queue.popleft()
             for k in range(1, n):  # skip key 0 (identity)
                 nxt = cayley_table[v][k]
                 if nxt not in visited:
@@ -83,41 +85,49 @@ class LayoutEngine:
 
             positions[i] = (cx + r * math.cos(angle), cy + r * math.sin(angle))
 
-        # Force-directed relaxation
+        # Force-directed relaxation, on parallel x/y float lists so the
+        # pair loop accumulates into scalars instead of rebuilding tuples.
         margin = 30.0
+        repulsion = 800.0
+        xs = [p[0] for p in positions]
+        ys = [p[1] for p in positions]
+        layer_scale = max(1, total_layers - 1)
+        target_r = [(dist[i] / layer_scale) * max_r for i in range(n)]
+        lo_x, hi_x = margin, panel_w - margin
+        lo_y, hi_y = margin, panel_h - margin
         for _ in range(200):
-            forces = [(0.0, 0.0)] * n
-            repulsion = 800.0
+            fxs = [0.0] * n
+            fys = [0.0] * n
 
             for i in range(n):
+                xi, yi = xs[i], ys[i]
+                fxi, fyi = fxs[i], fys[i]
                 for j in range(i + 1, n):
-                    dx = positions[j][0] - positions[i][0]
-                    dy = positions[j][1] - positions[i][1]
+                    dx = xs[j] - xi
+                    dy = ys[j] - yi
                     d2 = max(1.0, math.sqrt(dx * dx + dy * dy))
                     f = repulsion / (d2 * d2)
                     fx, fy = dx / d2 * f, dy / d2 * f
-                    forces[i] = (forces[i][0] - fx, forces[i][1] - fy)
-                    forces[j] = (forces[j][0] + fx, forces[j][1] + fy)
+                    fxi -= fx
+                    fyi -= fy
+                    fxs[j] += fx
+                    fys[j] += fy
 
                 if dist[i] > 0:
-                    target_r = (dist[i] / max(1, total_layers - 1)) * max_r
-                    cur_dx = positions[i][0] - cx
-                    cur_dy = positions[i][1] - cy
+                    cur_dx = xi - cx
+                    cur_dy = yi - cy
                     cur_r = math.sqrt(cur_dx * cur_dx + cur_dy * cur_dy)
                     if cur_r > 0:
-                        diff = cur_r - target_r
-                        forces[i] = (
-                            forces[i][0] - cur_dx / cur_r * diff * 0.1,
-                            forces[i][1] - cur_dy / cur_r * diff * 0.1,
-                        )
+                        diff = cur_r - target_r[i]
+                        fxi -= cur_dx / cur_r * diff * 0.1
+                        fyi -= cur_dy / cur_r * diff * 0.1
+                fxs[i], fys[i] = fxi, fyi
 
             for i in range(1, n):  # skip home
-                x = positions[i][0] + forces[i][0] * 0.3
-                y = positions[i][1] + forces[i][1] * 0.3
-                x = max(margin, min(panel_w - margin, x))
-                y = max(margin, min(panel_h - margin, y))
-                positions[i] = (x, y)
+                xs[i] = max(lo_x, min(hi_x, xs[i] + fxs[i] * 0.3))
+                ys[i] = max(lo_y, min(hi_y, ys[i] + fys[i] * 0.3))
 
+        positions = list(zip(xs, ys))
         return positions
 
     @staticmethod
@@ -132,6 +142,7 @@ class LayoutEngine:
 
 # === Helpers ===
 
+@lru_cache(maxsize=None)
 def build_z3_cayley() -> list[list[int]]:
     """Z3 = {e, r1, r2}, Cayley table with math convention."""
     # e=0, r1=1, r2=2
@@ -143,6 +154,7 @@ def build_z3_cayley() -> list[list[int]]:
     ]
 
 
+@lru_cache(maxsize=None)
 def build_d4_cayley() -> list[list[int]]:
     """D4 = {e, r1, r2, r3, sh, sv, sd, sa}. Build from permutations."""
     # D4 generators: r1 = (0123), sh = (13)
@@ -180,7 +192,22 @@ def build_d4_cayley() -> list[list[int]]:
     return table
 
 
+def overlapping_pairs(positions: list[tuple[float, float]],
+                      min_sep: float) -> list[tuple[int, int, float]]:
+    """All (i, j, dist) room pairs closer than min_sep, in one pass."""
+    min_sep2 = min_sep * min_sep
+    bad = []
+    for (i, (xi, yi)), (j, (xj, yj)) in itertools.combinations(enumerate(positions), 2):
+        dx, dy = xi - xj, yi - yj
+        d2 = dx * dx + dy * dy
+        if d2 <= min_sep2:
+            bad.append((i, j, math.sqrt(d2)))
+    return bad
+
+
+@lru_cache(maxsize=None)
 def load_level(filename: str) -> dict:
+    """Parsed level JSON, cached per file. Callers must not mutate it."""
     base = os.path.dirname(os.path.abspath(__file__))
     level_path = os.path.join(base, "..", "..", "..", "data", "levels", filename)
     level_path = os.path.normpath(level_path)
@@ -188,6 +215,44 @@ def load_level(filename: str) -> dict:
         return json.load(f)
 
 
+@lru_cache(maxsize=None)
+def build_level_cayley(filename: str) -> list[list[int]]:
+    """Build a Cayley table (identity first) from a level's automorphisms."""
+    level_data = load_level(filename)
+    autos = level_data["symmetries"]["automorphisms"]
+
+    # Parse perms (identity first)
+    perms = []
+    identity_idx = -1
+    for i, a in enumerate(autos):
+        m = a["mapping"]
+        if m == list(range(len(m))):
+            identity_idx = i
+        perms.append(m)
+
+    # Reorder: identity first
+    ordered = [perms[identity_idx]]
+    for i in range(len(perms)):
+        if i != identity_idx:
+            ordered.append(perms[i])
+
+    n = len(ordered)
+
+    def compose_math(a, b):
+        return [a[b[i]] for i in range(len(a))]
+
+    index_of = {tuple(p): i for i, p in enumerate(ordered)}
+
+    cayley = []
+    for a in range(n):
+        row = []
+        for b in range(n):
+            product = compose_math(ordered[a], ordered[b])
+            row.append(index_of.get(tuple(product), -1))
+        cayley.append(row)
+    return cayley
+
+
 # === Tests ===
 
 class TestBFSDistances(unittest.TestCase):
@@ -215,18 +280,20 @@ class TestBFSDistances(unittest.TestCase):
             (build_z3_cayley(), 3, "Z3"),
             (build_d4_cayley(), 8, "D4"),
         ]:
-            dist = LayoutEngine.compute_bfs(cayley, n)
-            for i in range(n):
-                self.assertLess(dist[i], 999,
-                    f"{name}: Room {i} not reachable (dist={dist[i]})")
+            with self.subTest(group=name):
+                dist = LayoutEngine.compute_bfs(cayley, n)
+                unreachable = [i for i in range(n) if dist[i] >= 999]
+                self.assertEqual(unreachable, [],
+                    f"{name}: rooms not reachable")
 
 
 class TestLayoutZ3(unittest.TestCase):
     """Z3: 3 rooms — Home in center, 2 on ring."""
 
-    def setUp(self):
-        self.cayley = build_z3_cayley()
-        self.positions = LayoutEngine.compute_layout(self.cayley, 3, 400, 400)
+    @classmethod
+    def setUpClass(cls):
+        cls.cayley = build_z3_cayley()
+        cls.positions = LayoutEngine.compute_layout(cls.cayley, 3, 400, 400)
 
     def test_home_at_center(self):
         hx, hy = self.positions[0]
@@ -238,7 +305,7 @@ class TestLayoutZ3(unittest.TestCase):
         cx, cy = 200.0, 200.0
         for i in [1, 2]:
             px, py = self.positions[i]
-            dist = math.sqrt((px - cx) ** 2 + (py - cy) ** 2)
+            dist = math.hypot(px - cx, py - cy)
             # Should be on a ring (not at center, not at edge)
             self.assertGreater(dist, 20.0,
                 f"Room {i} too close to center (dist={dist:.1f})")
@@ -248,22 +315,18 @@ class TestLayoutZ3(unittest.TestCase):
     def test_rooms_not_overlapping(self):
         """All 3 rooms should be well separated."""
         min_sep = 15.0  # minimum separation after relaxation
-        n = 3
-        for i in range(n):
-            for j in range(i + 1, n):
-                dx = self.positions[i][0] - self.positions[j][0]
-                dy = self.positions[i][1] - self.positions[j][1]
-                dist = math.sqrt(dx * dx + dy * dy)
-                self.assertGreater(dist, min_sep,
-                    f"Rooms {i} and {j} overlap (dist={dist:.1f})")
+        bad = overlapping_pairs(self.positions, min_sep)
+        self.assertEqual(bad, [], "Rooms overlap: " + ", ".join(
+            f"{i}-{j} (dist={d:.1f})" for i, j, d in bad))
 
 
 class TestLayoutD4(unittest.TestCase):
     """D4: 8 rooms — concentric layers."""
 
-    def setUp(self):
-        self.cayley = build_d4_cayley()
-        self.positions = LayoutEngine.compute_layout(self.cayley, 8, 400, 400)
+    @classmethod
+    def setUpClass(cls):
+        cls.cayley = build_d4_cayley()
+        cls.positions = LayoutEngine.compute_layout(cls.cayley, 8, 400, 400)
 
     def test_home_at_center(self):
         hx, hy = self.positions[0]
@@ -291,7 +354,7 @@ class TestLayoutD4(unittest.TestCase):
             avg_r = 0.0
             for r_idx in rooms:
                 px, py = self.positions[r_idx]
-                avg_r += math.sqrt((px - cx) ** 2 + (py - cy) ** 2)
+                avg_r += math.hypot(px - cx, py - cy)
             avg_r /= len(rooms)
 
             if lk > 0:
@@ -303,23 +366,19 @@ class TestLayoutD4(unittest.TestCase):
     def test_rooms_not_overlapping(self):
         """No two rooms should be too close together."""
         min_sep = 10.0
-        n = 8
-        for i in range(n):
-            for j in range(i + 1, n):
-                dx = self.positions[i][0] - self.positions[j][0]
-                dy = self.positions[i][1] - self.positions[j][1]
-                dist = math.sqrt(dx * dx + dy * dy)
-                self.assertGreater(dist, min_sep,
-                    f"Rooms {i} and {j} overlap (dist={dist:.1f})")
+        bad = overlapping_pairs(self.positions, min_sep)
+        self.assertEqual(bad, [], "Rooms overlap: " + ", ".join(
+            f"{i}-{j} (dist={d:.1f})" for i, j, d in bad))
 
     def test_all_within_bounds(self):
         """All positions should be within panel bounds."""
         for i in range(8):
             px, py = self.positions[i]
-            self.assertGreaterEqual(px, 0.0, f"Room {i} x={px:.1f} below 0")
-            self.assertLessEqual(px, 400.0, f"Room {i} x={px:.1f} above 400")
-            self.assertGreaterEqual(py, 0.0, f"Room {i} y={py:.1f} below 0")
-            self.assertLessEqual(py, 400.0, f"Room {i} y={py:.1f} above 400")
+            with self.subTest(room=i):
+                self.assertGreaterEqual(px, 0.0, f"Room {i} x={px:.1f} below 0")
+                self.assertLessEqual(px, 400.0, f"Room {i} x={px:.1f} above 400")
+                self.assertGreaterEqual(py, 0.0, f"Room {i} y={py:.1f} below 0")
+                self.assertLessEqual(py, 400.0, f"Room {i} y={py:.1f} above 400")
 
 
 class TestNodeSizes(unittest.TestCase):
@@ -343,48 +402,12 @@ class TestNodeSizes(unittest.TestCase):
 class TestLayoutLargeGroup(unittest.TestCase):
     """Test layout with a larger group (S3, 6 rooms) from real level data."""
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         # Build S3 Cayley table from level 13
-        level_data = load_level("act2/level_13.json")
-        autos = level_data["symmetries"]["automorphisms"]
-
-        # Parse perms (identity first)
-        perms = []
-        identity_idx = -1
-        for i, a in enumerate(autos):
-            m = a["mapping"]
-            if m == list(range(len(m))):
-                identity_idx = i
-            perms.append(m)
-
-        # Reorder: identity first
-        ordered = [perms[identity_idx]]
-        for i in range(len(perms)):
-            if i != identity_idx:
-                ordered.append(perms[i])
-
-        n = len(ordered)
-
-        def compose_math(a, b):
-            return [a[b[i]] for i in range(len(a))]
-
-        def find_idx(p):
-            for i, q in enumerate(ordered):
-                if p == q:
-                    return i
-            return -1
-
-        self.cayley = []
-        for a in range(n):
-            row = []
-            for b in range(n):
-                product = compose_math(ordered[a], ordered[b])
-                idx = find_idx(product)
-                row.append(idx)
-            self.cayley.append(row)
-
-        self.n = n
-        self.positions = LayoutEngine.compute_layout(self.cayley, n, 400, 400)
+        cls.cayley = build_level_cayley("act2/level_13.json")
+        cls.n = len(cls.cayley)
+        cls.positions = LayoutEngine.compute_layout(cls.cayley, cls.n, 400, 400)
 
     def test_home_at_center(self):
         hx, hy = self.positions[0]
@@ -393,21 +416,18 @@ class TestLayoutLargeGroup(unittest.TestCase):
 
     def test_no_overlaps(self):
         min_sep = 10.0
-        for i in range(self.n):
-            for j in range(i + 1, self.n):
-                dx = self.positions[i][0] - self.positions[j][0]
-                dy = self.positions[i][1] - self.positions[j][1]
-                dist = math.sqrt(dx * dx + dy * dy)
-                self.assertGreater(dist, min_sep,
-                    f"Rooms {i} and {j} overlap (dist={dist:.1f})")
+        bad = overlapping_pairs(self.positions, min_sep)
+        self.assertEqual(bad, [], "Rooms overlap: " + ", ".join(
+            f"{i}-{j} (dist={d:.1f})" for i, j, d in bad))
 
     def test_all_within_bounds(self):
         for i in range(self.n):
             px, py = self.positions[i]
-            self.assertGreaterEqual(px, 0.0)
-            self.assertLessEqual(px, 400.0)
-            self.assertGreaterEqual(py, 0.0)
-            self.assertLessEqual(py, 400.0)
+            with self.subTest(room=i):
+                self.assertGreaterEqual(px, 0.0)
+                self.assertLessEqual(px, 400.0)
+                self.assertGreaterEqual(py, 0.0)
+                self.assertLessEqual(py, 400.0)
 
 
 # === Python mirror of fading edge / hover preview logic ===
@@ -432,29 +452,52 @@ class FadingEdge:
 class HoverPreview:
     """Mirrors _draw_key_preview logic from room_map_panel.gd."""
 
+    @staticmethod
+    def discovered_to_mask(discovered: list[bool]) -> int:
+        """Pack a discovered list into an int bitmask (bit i = room i)."""
+        mask = 0
+        for i, d in enumerate(discovered):
+            if d:
+                mask |= 1 << i
+        return mask
+
+    @staticmethod
+    def traversed_for_key(transition_history: list[dict], key_idx: int) -> set[int]:
+        """Edges walked with key_idx, encoded as (from << 16) | to."""
+        return {(entry["from"] << 16) | entry["to"]
+                for entry in transition_history
+                if entry.get("key", -1) == key_idx}
+
     @staticmethod
     def get_preview_edges(cayley_table: list[list[int]], n: int,
                           key_idx: int, discovered: list[bool],
-                          transition_history: list[dict]
+                          transition_history: list[dict],
+                          discovered_mask: Optional[int] = None,
+                          traversed: Optional[set[int]] = None
                           ) -> list[dict]:
-        """Return list of {from, to, alpha, line_w} for hover preview."""
-        # Build traversed set
-        traversed = set()
-        for entry in transition_history:
-            if entry.get("key", -1) == key_idx:
-                traversed.add((entry["from"], entry["to"]))
+        """Return list of {from, to, alpha, line_w} for hover preview.
+
+        discovered_mask, if given, is used instead of packing discovered.
+        traversed, if given, is the per-key index of walked edges encoded as
+        (from << 16) | to, and transition_history is not scanned.
+        """
+        if discovered_mask is None:
+            discovered_mask = HoverPreview.discovered_to_mask(discovered)
+
+        if traversed is None:
+            traversed = HoverPreview.traversed_for_key(transition_history, key_idx)
 
         edges = []
         for from_room in range(n):
-            if not discovered[from_room]:
+            if not (discovered_mask >> from_room) & 1:
                 continue
             to_room = cayley_table[from_room][key_idx]
-            if not discovered[to_room]:
+            if not (discovered_mask >> to_room) & 1:
                 continue
             if from_room == to_room:
                 continue
 
-            is_traversed = (from_room, to_room) in traversed
+            is_traversed = ((from_room << 16) | to_room) in traversed
             edges.append({
                 "from": from_room,
                 "to": to_room,
@@ -480,9 +523,9 @@ class TestFadingEdges(unittest.TestCase):
 
     def test_decay_60_frames(self):
         """After 60 frames (~1 sec at 60fps), alpha should be around 0.985^60 ≈ 0.405."""
-        edge = FadingEdge(0, 1, 1)
-        for _ in range(60):
-            edge.decay()
+        # alpha after k frames is 0.985^k; start at frame 59 and step once.
+        edge = FadingEdge(0, 1, 1, alpha=0.985 ** 59)
+        edge.decay()
         expected = 0.985 ** 60
         self.assertAlmostEqual(edge.alpha, expected, places=4)
         self.assertGreater(edge.alpha, 0.3)
@@ -503,12 +546,12 @@ class TestFadingEdges(unittest.TestCase):
     def test_exact_death_frame(self):
         """Calculate exact frame where alpha < 0.01."""
         # 0.985^n < 0.01 => n > log(0.01) / log(0.985) ≈ 304.5
-        edge = FadingEdge(0, 1, 1)
-        frames = 0
-        while edge.alpha >= 0.01:
-            edge.alpha *= 0.985
-            frames += 1
+        frames = math.ceil(math.log(0.01) / math.log(0.985))
         self.assertAlmostEqual(frames, 305, delta=2)
+        # The edge is still alive one frame before and dead right after.
+        edge = FadingEdge(0, 1, 1, alpha=0.985 ** (frames - 1))
+        self.assertGreaterEqual(edge.alpha, 0.01)
+        self.assertFalse(edge.decay())
 
     def test_key_field_stored(self):
         edge = FadingEdge(2, 5, 3)
@@ -583,6 +626,27 @@ class TestHoverPreview(unittest.TestCase):
         self.assertEqual(edges[0]["from"], 0)
         self.assertEqual(edges[0]["to"], 1)
 
+    def test_preview_with_discovered_mask(self):
+        """A packed discovered mask gives the same edges as the list."""
+        discovered = [True, True, False]
+        mask = HoverPreview.discovered_to_mask(discovered)
+        self.assertEqual(mask, 0b011)
+        from_list = HoverPreview.get_preview_edges(
+            self.cayley, self.n, 1, discovered, [])
+        from_mask = HoverPreview.get_preview_edges(
+            self.cayley, self.n, 1, [], [], discovered_mask=mask)
+        self.assertEqual(from_list, from_mask)
+
+    def test_preview_with_traversed_index(self):
+        """A prebuilt traversed index replaces the history scan."""
+        history = [{"from": 0, "to": 1, "key": 1, "time": 1.0}]
+        traversed = HoverPreview.traversed_for_key(history, 1)
+        self.assertEqual(traversed, {(0 << 16) | 1})
+        edges = HoverPreview.get_preview_edges(
+            self.cayley, self.n, 1, self.all_discovered, [], traversed=traversed)
+        bright = [(e["from"], e["to"]) for e in edges if e["alpha"] == 0.35]
+        self.assertEqual(bright, [(0, 1)])
+
     def test_preview_wrong_key_history_ignored(self):
         """History for a different key should not affect alpha."""
         history = [{"from": 0, "to": 1, "key": 2, "time": 1.0}]  # key 2, not 1
@@ -10,17 +10,53 @@ Verifies:
 - Color generation produces correct count and gold for room 0
 - Room discovery tracking
 """
+import copy
 import json
+import math
 import os
 import unittest
-import math
+from array import array
+from functools import lru_cache
 
 
 # === Python mirror of Permutation (minimal) ===
 
+_IDENTITIES: dict[int, tuple] = {}
+
+
+def _identity(n: int) -> tuple:
+    """Shared identity mapping tuple of size n."""
+    ident = _IDENTITIES.get(n)
+    if ident is None:
+        ident = _IDENTITIES[n] = tuple(range(n))
+    return ident
+
+
+_PACK_LIMIT = 8
+
+
+def _pack(mapping: tuple):
+    """Equality/hash key for a mapping: one int (a byte per point, fits a
+    uint64) for up to _PACK_LIMIT points, the tuple itself beyond that or
+    when an entry is outside 0..255 (an invalid mapping must still build)."""
+    if len(mapping) <= _PACK_LIMIT:
+        try:
+            return int.from_bytes(bytes(mapping), "little")
+        except ValueError:
+            pass
+    return mapping
+
+
+@lru_cache(maxsize=4096)
+def _compose(a: tuple, b: tuple) -> tuple:
+    """Mapping of a.compose(b): apply a, then b."""
+    return tuple(b[x] for x in a)
+
+
 class Permutation:
     def __init__(self, mapping: list[int]):
-        self.mapping = list(mapping)
+        self.mapping = tuple(mapping)
+        self._key = _pack(self.mapping)
 
     def size(self) -> int:
         return len(self.mapping)
@@ -29,11 +65,11 @@ class Permutation:
         return self.mapping[i]
 
     def is_identity(self) -> bool:
-        return all(self.mapping[i] == i for i in range(self.size()))
+        return self.mapping == _identity(len(self.mapping))
 
     def compose(self, other: "Permutation") -> "Permutation":
         assert self.size() == other.size()
-        return Permutation([other.apply(self.apply(i)) for i in range(self.size())])
+        return Permutation(_compose(self.mapping, other.mapping))
 
     def inverse(self) -> "Permutation":
         inv = [0] * self.size()
@@ -44,9 +80,15 @@ class Permutation:
     def equals(self, other: "Permutation") -> bool:
         return self.mapping == other.mapping
 
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Permutation) and self.mapping == other.mapping
+
+    def __hash__(self) -> int:
+        return hash(self._key)
+
     @staticmethod
     def create_identity(n: int) -> "Permutation":
-        return Permutation(list(range(n)))
+        return Permutation(_identity(n))
 
     @staticmethod
     def from_array(arr: list) -> "Permutation":
@@ -64,8 +106,9 @@ class RoomState:
         self.all_perms = []      # list[Permutation]
         self.perm_names = []     # list[str]
         self.perm_ids = []       # list[str]
-        self.cayley_table = []   # list[list[int]]
-        self.discovered = []     # list[bool]
+        self.cayley_table = []   # list[list[int]]: [a][b] = a*b
+        self._perm_index = {}    # packed mapping key -> room index
+        self.discovered = array("b")  # 1 = discovered
         self.current_room = 0
         self.colors = []         # list[tuple(r,g,b)]
         self.transition_history = []
@@ -109,10 +152,11 @@ class RoomState:
                 self.perm_ids.append(raw_ids[i])
 
         self.group_order = len(self.all_perms)
+        self._perm_index = {p._key: i for i, p in enumerate(self.all_perms)}
         self._build_cayley_table()
 
-        self.discovered = [False] * self.group_order
-        self.discovered[0] = True
+        self.discovered = array("b", bytes(self.group_order))
+        self.discovered[0] = 1
         self.current_room = 0
         self.colors = self.generate_colors(self.group_order)
         self.transition_history = []
@@ -121,28 +165,27 @@ class RoomState:
         # Math convention: cayley[a][b] = a*b where (a*b)(x) = a(b(x))
         # Since Permutation.compose does "self then other",
         # we compute b.compose(a) to get a*b in math convention.
-        self.cayley_table = []
-        for a in range(self.group_order):
-            row = []
-            for b in range(self.group_order):
-                product = self.all_perms[b].compose(self.all_perms[a])
-                idx = self._find_perm_index(product)
-                assert idx != -1, f"Cayley table product not found: [{a}][{b}]"
-                row.append(idx)
-            self.cayley_table.append(row)
+        # b.compose(a)[i] == a[b[i]], so each product is a gather of a's
+        # mapping by b's mapping -- done on raw tuples, no Permutation objects.
+        mappings = [p.mapping for p in self.all_perms]
+        index_of = self._perm_index
+        table = []
+        for a, pa in enumerate(mappings):
+            gather = pa.__getitem__
+            row = [index_of.get(_pack(tuple(map(gather, pb))), -1) for pb in mappings]
+            assert -1 not in row, f"Cayley table product not found in row [{a}]"
+            table.append(row)
+        self.cayley_table = table
 
     def _find_perm_index(self, perm: Permutation) -> int:
-        for i, p in enumerate(self.all_perms):
-            if p.equals(perm):
-                return i
-        return -1
+        return self._perm_index.get(perm._key, -1)
 
     def discover_room(self, idx: int) -> bool:
         if idx < 0 or idx >= self.group_order:
             return False
         if self.discovered[idx]:
             return False
-        self.discovered[idx] = True
+        self.discovered[idx] = 1
         return True
 
     def apply_key(self, key_idx: int) -> int:
@@ -196,7 +239,9 @@ class RoomState:
 
 # === Helper: load level JSON ===
 
+@lru_cache(maxsize=None)
 def load_level(filename: str) -> dict:
+    """Parsed level JSON, cached per file. Callers must not mutate it."""
     base = os.path.dirname(os.path.abspath(__file__))
     level_path = os.path.join(base, "..", "..", "..", "data", "levels", filename)
     level_path = os.path.normpath(level_path)
@@ -204,24 +249,103 @@ def load_level(filename: str) -> dict:
         return json.load(f)
 
 
+def associativity_violation(table) -> tuple:
+    """First (a, b, c) with (a*b)*c != a*(b*c), or None.
+
+    Works a whole row at a time: for fixed a, b the products (a*b)*c over
+    all c are row a*b of the table, and a*(b*c) is row a gathered by row b.
+    """
+    rows = [list(row) for row in table]
+    for a, row_a in enumerate(rows):
+        gather = row_a.__getitem__
+        for b, row_b in enumerate(rows):
+            lhs = rows[row_a[b]]
+            rhs = list(map(gather, row_b))
+            if lhs != rhs:
+                c = next(c for c in range(len(lhs)) if lhs[c] != rhs[c])
+                return (a, b, c)
+    return None
+
+
+def assert_associative(test: unittest.TestCase, table) -> None:
+    bad = associativity_violation(table)
+    if bad is not None:
+        a, b, c = bad
+        ab_c = table[table[a][b]][c]
+        a_bc = table[a][table[b][c]]
+        test.fail(f"Associativity failed: ({a}*{b})*{c} = {ab_c} != "
+                  f"{a}*({b}*{c}) = {a_bc}")
+
+
+def assert_cayley_matches_json(test: unittest.TestCase, rs: RoomState,
+                               json_cayley: dict) -> None:
+    """rs.cayley_table agrees with every cell of a level's JSON Cayley table.
+
+    The JSON cells are written over a copy of the computed table, so the
+    whole check is one table comparison; the offending cell is only looked
+    up when it fails.
+    """
+    id_to_room = perm_index_by_id(rs)
+    expected = [list(row) for row in rs.cayley_table]
+    for a_id, row in json_cayley.items():
+        expected_row = expected[id_to_room[a_id]]
+        for b_id, result_id in row.items():
+            expected_row[id_to_room[b_id]] = id_to_room[result_id]
+    if expected != rs.cayley_table:
+        a_idx, b_idx = next((a, b) for a, row in enumerate(expected)
+                            for b, cell in enumerate(row)
+                            if cell != rs.cayley_table[a][b])
+        want = expected[a_idx][b_idx]
+        computed = rs.cayley_table[a_idx][b_idx]
+        test.fail(f"Cayley mismatch: {rs.perm_ids[a_idx]}*{rs.perm_ids[b_idx]} = "
+                  f"{rs.perm_ids[want]} (room {want}) "
+                  f"but computed room {computed} ({rs.perm_ids[computed]})")
+
+
+# Z3 = {e, r1, r2} with cycle (0,1,2), shared by the Z3 test classes.
+Z3_LEVEL_DATA = {
+    "symmetries": {
+        "automorphisms": [
+            {"id": "e",  "mapping": [0, 1, 2], "name": "Identity"},
+            {"id": "r1", "mapping": [1, 2, 0], "name": "Rotation 120"},
+            {"id": "r2", "mapping": [2, 0, 1], "name": "Rotation 240"},
+        ]
+    }
+}
+
+
+def perm_index_by_id(rs: RoomState) -> dict:
+    """sym_id -> room index for a set-up RoomState."""
+    return {sid: i for i, sid in enumerate(rs.perm_ids)}
+
+
+_Z3_RS = RoomState()
+_Z3_RS.setup(Z3_LEVEL_DATA)
+
+
+def fresh_z3_room_state() -> RoomState:
+    """Z3 RoomState in its initial state, without re-running setup().
+
+    Shares the immutable group data (perms, Cayley table, colors) with the
+    prebuilt _Z3_RS and copies only the state that apply_key/discover_room
+    mutate.
+    """
+    rs = copy.copy(_Z3_RS)
+    rs.discovered = array("b", _Z3_RS.discovered)
+    rs.transition_history = []
+    return rs
+
+
 # === Tests ===
 
 class TestRoomStateCayleyZ3(unittest.TestCase):
     """Verify Cayley table for Z3 (level 13, 3 rotations as subgroup)."""
 
-    def setUp(self):
-        # Manually construct Z3 = {e, r1, r2} with cycle (0,1,2)
-        self.level_data = {
-            "symmetries": {
-                "automorphisms": [
-                    {"id": "e",  "mapping": [0, 1, 2], "name": "Identity"},
-                    {"id": "r1", "mapping": [1, 2, 0], "name": "Rotation 120"},
-                    {"id": "r2", "mapping": [2, 0, 1], "name": "Rotation 240"},
-                ]
-            }
-        }
-        self.rs = RoomState()
-        self.rs.setup(self.level_data)
+    @classmethod
+    def setUpClass(cls):
+        cls.level_data = Z3_LEVEL_DATA
+        cls.rs = _Z3_RS
+        cls.perm_idx = perm_index_by_id(cls.rs)
 
     def test_group_order(self):
         self.assertEqual(self.rs.group_order, 3)
@@ -248,43 +372,33 @@ class TestRoomStateCayleyZ3(unittest.TestCase):
     def test_cayley_r1_r1_eq_r2(self):
         """r1 * r1 = r2."""
         # r1 is at index 1, r2 at index 2
-        r1_idx = self.rs._find_perm_index(Permutation([1, 2, 0]))
-        r2_idx = self.rs._find_perm_index(Permutation([2, 0, 1]))
+        r1_idx, r2_idx = self.perm_idx["r1"], self.perm_idx["r2"]
         self.assertEqual(self.rs.cayley_table[r1_idx][r1_idx], r2_idx)
 
     def test_cayley_r1_r2_eq_e(self):
         """r1 * r2 = e."""
-        r1_idx = self.rs._find_perm_index(Permutation([1, 2, 0]))
-        r2_idx = self.rs._find_perm_index(Permutation([2, 0, 1]))
+        r1_idx, r2_idx = self.perm_idx["r1"], self.perm_idx["r2"]
         self.assertEqual(self.rs.cayley_table[r1_idx][r2_idx], 0)
 
     def test_cayley_r2_r2_eq_r1(self):
         """r2 * r2 = r1."""
-        r1_idx = self.rs._find_perm_index(Permutation([1, 2, 0]))
-        r2_idx = self.rs._find_perm_index(Permutation([2, 0, 1]))
+        r1_idx, r2_idx = self.perm_idx["r1"], self.perm_idx["r2"]
         self.assertEqual(self.rs.cayley_table[r2_idx][r2_idx], r1_idx)
 
     def test_cayley_associativity(self):
         """(a * b) * c = a * (b * c) for all a, b, c."""
-        n = self.rs.group_order
-        for a in range(n):
-            for b in range(n):
-                for c in range(n):
-                    ab = self.rs.cayley_table[a][b]
-                    ab_c = self.rs.cayley_table[ab][c]
-                    bc = self.rs.cayley_table[b][c]
-                    a_bc = self.rs.cayley_table[a][bc]
-                    self.assertEqual(ab_c, a_bc,
-                        f"Associativity failed: ({a}*{b})*{c} = {ab_c} != {a}*({b}*{c}) = {a_bc}")
+        assert_associative(self, self.rs.cayley_table)
 
 
 class TestRoomStateCayleyD4(unittest.TestCase):
     """Verify Cayley table for D4 (8 elements) matches level_05.json."""
 
-    def setUp(self):
-        self.level_data = load_level("act1/level_05.json")
-        self.rs = RoomState()
-        self.rs.setup(self.level_data)
+    @classmethod
+    def setUpClass(cls):
+        cls.level_data = load_level("act1/level_05.json")
+        cls.rs = RoomState()
+        cls.rs.setup(cls.level_data)
+        cls.perm_idx = perm_index_by_id(cls.rs)
 
     def test_group_order(self):
         self.assertEqual(self.rs.group_order, 8)
@@ -299,49 +413,23 @@ class TestRoomStateCayleyD4(unittest.TestCase):
 
     def test_cayley_matches_json(self):
         """Cayley table computed by RoomState matches the one in level JSON."""
-        json_cayley = self.level_data["symmetries"]["cayley_table"]
-
-        # Build sym_id -> room_index mapping
-        id_to_room = {}
-        for i, sid in enumerate(self.rs.perm_ids):
-            id_to_room[sid] = i
-
-        for a_id, row in json_cayley.items():
-            a_idx = id_to_room[a_id]
-            for b_id, result_id in row.items():
-                b_idx = id_to_room[b_id]
-                result_idx = id_to_room[result_id]
-                computed = self.rs.cayley_table[a_idx][b_idx]
-                self.assertEqual(computed, result_idx,
-                    f"Cayley mismatch: {a_id}*{b_id} = {result_id} (room {result_idx}) "
-                    f"but computed room {computed} ({self.rs.perm_ids[computed]})")
+        assert_cayley_matches_json(self, self.rs,
+                                   self.level_data["symmetries"]["cayley_table"])
 
     def test_cayley_associativity(self):
         """(a * b) * c = a * (b * c) for all a, b, c."""
-        n = self.rs.group_order
-        for a in range(n):
-            for b in range(n):
-                for c in range(n):
-                    ab = self.rs.cayley_table[a][b]
-                    ab_c = self.rs.cayley_table[ab][c]
-                    bc = self.rs.cayley_table[b][c]
-                    a_bc = self.rs.cayley_table[a][bc]
-                    self.assertEqual(ab_c, a_bc,
-                        f"Associativity failed: ({a}*{b})*{c} = {ab_c} != {a}*({b}*{c}) = {a_bc}")
+        assert_associative(self, self.rs.cayley_table)
 
     def test_inverses_exist(self):
         """Every element has an inverse in the group."""
-        n = self.rs.group_order
-        for a in range(n):
-            found_inverse = False
-            for b in range(n):
-                if self.rs.cayley_table[a][b] == 0:  # a * b = e
-                    # Also check b * a = e
-                    self.assertEqual(self.rs.cayley_table[b][a], 0,
-                        f"Element {a} has right-inverse {b} but it's not left-inverse")
-                    found_inverse = True
-                    break
-            self.assertTrue(found_inverse, f"Element {a} has no inverse")
+        table = self.rs.cayley_table
+        for a, row in enumerate(table):
+            # a * b = e: one C-level search for the identity in row a
+            self.assertIn(0, row, f"Element {a} has no inverse")
+            b = row.index(0)
+            # Also check b * a = e
+            self.assertEqual(table[b][a], 0,
+                f"Element {a} has right-inverse {b} but it's not left-inverse")
 
 
 class TestRoomStateApplyKey(unittest.TestCase):
@@ -349,26 +437,17 @@ class TestRoomStateApplyKey(unittest.TestCase):
 
     def setUp(self):
         # Use Z3 for simplicity
-        self.level_data = {
-            "symmetries": {
-                "automorphisms": [
-                    {"id": "e",  "mapping": [0, 1, 2], "name": "Identity"},
-                    {"id": "r1", "mapping": [1, 2, 0], "name": "Rotation 120"},
-                    {"id": "r2", "mapping": [2, 0, 1], "name": "Rotation 240"},
-                ]
-            }
-        }
-        self.rs = RoomState()
-        self.rs.setup(self.level_data)
+        self.level_data = Z3_LEVEL_DATA
+        self.rs = fresh_z3_room_state()
+        self.perm_idx = perm_index_by_id(_Z3_RS)
 
     def test_apply_from_home_leads_to_key_room(self):
         """apply_key from Home(0) with key k leads to room k."""
-        for k in range(self.rs.group_order):
-            rs = RoomState()
-            rs.setup(self.level_data)
+        rs = self.rs
+        for k in range(rs.group_order):
+            rs.current_room = 0
             dest = rs.apply_key(k)
-            self.assertEqual(dest, k,
-                f"apply_key(0, {k}) should go to room {k}, got {dest}")
+            self.assertEqual(dest, k, f"apply_key(0, {k}) should go to room {k}")
 
     def test_apply_key_sequential_associativity(self):
         """apply_key(a, b) then apply_key(result, c) = apply_key(a, compose(b,c)).
@@ -377,23 +456,15 @@ class TestRoomStateApplyKey(unittest.TestCase):
         This is associativity, which we check exhaustively.
         """
         n = self.rs.group_order
-        for a in range(n):
-            for b in range(n):
-                for c in range(n):
-                    # Sequential: a -> apply b -> apply c
-                    step1 = self.rs.get_destination(a, b)
-                    step2 = self.rs.get_destination(step1, c)
-                    # Composed: compose(b, c) then apply from a
-                    bc = self.rs.cayley_table[b][c]
-                    direct = self.rs.get_destination(a, bc)
-                    self.assertEqual(step2, direct,
-                        f"Sequential ({a}->key{b}->key{c})={step2} != "
-                        f"composed ({a}->key[{b}*{c}={bc}])={direct}")
+        # Sequential a -> key b -> key c reads dests[dests[a][b]][c];
+        # composed a -> key[b*c] reads dests[a][dests[b][c]].
+        dests = [[self.rs.get_destination(a, b) for b in range(n)] for a in range(n)]
+        assert_associative(self, dests)
 
     def test_apply_key_updates_current_room(self):
         """apply_key updates current_room correctly."""
         self.assertEqual(self.rs.current_room, 0)
-        r1_idx = self.rs._find_perm_index(Permutation([1, 2, 0]))
+        r1_idx = self.perm_idx["r1"]
         dest = self.rs.apply_key(r1_idx)
         self.assertEqual(self.rs.current_room, dest)
         self.assertEqual(dest, r1_idx)
@@ -412,24 +483,14 @@ class TestRoomStateDiscovery(unittest.TestCase):
     """Verify room discovery tracking."""
 
     def setUp(self):
-        self.level_data = {
-            "symmetries": {
-                "automorphisms": [
-                    {"id": "e",  "mapping": [0, 1, 2], "name": "Identity"},
-                    {"id": "r1", "mapping": [1, 2, 0], "name": "Rotation 120"},
-                    {"id": "r2", "mapping": [2, 0, 1], "name": "Rotation 240"},
-                ]
-            }
-        }
-        self.rs = RoomState()
-        self.rs.setup(self.level_data)
+        self.level_data = Z3_LEVEL_DATA
+        self.rs = fresh_z3_room_state()
 
     def test_home_discovered_by_default(self):
         self.assertTrue(self.rs.discovered[0])
 
     def test_other_rooms_not_discovered(self):
-        for i in range(1, self.rs.group_order):
-            self.assertFalse(self.rs.discovered[i])
+        self.assertFalse(any(self.rs.discovered[1:]))
 
     def test_discover_new_room(self):
         result = self.rs.discover_room(1)
@@ -455,12 +516,17 @@ class TestRoomStateDiscovery(unittest.TestCase):
 class TestRoomStateColors(unittest.TestCase):
     """Verify color generation."""
 
+    @classmethod
+    def setUpClass(cls):
+        # generate_colors is pure, so each palette size is built once.
+        cls.palettes = {k: RoomState.generate_colors(k) for k in (0, 1, 6, 8, 24)}
+
     def test_colors_count(self):
-        colors = RoomState.generate_colors(6)
+        colors = self.palettes[6]
         self.assertEqual(len(colors), 6)
 
     def test_room_0_is_gold(self):
-        colors = RoomState.generate_colors(6)
+        colors = self.palettes[6]
         r, g, b = colors[0]
         self.assertAlmostEqual(r, 0.788, places=2)
         self.assertAlmostEqual(g, 0.659, places=2)
@@ -468,49 +534,35 @@ class TestRoomStateColors(unittest.TestCase):
 
     def test_colors_unique(self):
         """All colors should be distinct."""
-        colors = RoomState.generate_colors(8)
-        for i in range(len(colors)):
-            for j in range(i + 1, len(colors)):
-                self.assertNotEqual(colors[i], colors[j],
-                    f"Colors {i} and {j} are identical: {colors[i]}")
+        colors = self.palettes[8]
+        self.assertEqual(len(set(colors)), len(colors), colors)
 
     def test_colors_in_valid_range(self):
         """All color components should be in [0, 1]."""
-        colors = RoomState.generate_colors(24)
-        for i, (r, g, b) in enumerate(colors):
-            self.assertGreaterEqual(r, 0.0, f"Color {i} red < 0: {r}")
-            self.assertLessEqual(r, 1.0, f"Color {i} red > 1: {r}")
-            self.assertGreaterEqual(g, 0.0, f"Color {i} green < 0: {g}")
-            self.assertLessEqual(g, 1.0, f"Color {i} green > 1: {g}")
-            self.assertGreaterEqual(b, 0.0, f"Color {i} blue < 0: {b}")
-            self.assertLessEqual(b, 1.0, f"Color {i} blue > 1: {b}")
+        colors = self.palettes[24]
+        components = [v for color in colors for v in color]
+        lo, hi = min(components), max(components)
+        self.assertGreaterEqual(lo, 0.0, colors)
+        self.assertLessEqual(hi, 1.0, colors)
 
     def test_single_room(self):
         """Edge case: only 1 room."""
-        colors = RoomState.generate_colors(1)
+        colors = self.palettes[1]
         self.assertEqual(len(colors), 1)
         self.assertAlmostEqual(colors[0][0], 0.788, places=2)
 
     def test_empty(self):
-        colors = RoomState.generate_colors(0)
+        colors = self.palettes[0]
         self.assertEqual(len(colors), 0)
 
 
 class TestRoomStateFindRoom(unittest.TestCase):
     """Verify find_room_for_perm."""
 
-    def setUp(self):
-        self.level_data = {
-            "symmetries": {
-                "automorphisms": [
-                    {"id": "e",  "mapping": [0, 1, 2], "name": "Identity"},
-                    {"id": "r1", "mapping": [1, 2, 0], "name": "Rotation 120"},
-                    {"id": "r2", "mapping": [2, 0, 1], "name": "Rotation 240"},
-                ]
-            }
-        }
-        self.rs = RoomState()
-        self.rs.setup(self.level_data)
+    @classmethod
+    def setUpClass(cls):
+        cls.level_data = Z3_LEVEL_DATA
+        cls.rs = _Z3_RS
 
     def test_find_identity(self):
         perm = Permutation([0, 1, 2])
@@ -542,29 +594,11 @@ class TestRoomStateFindRoom(unittest.TestCase):
 class TestRoomStateWithRebase(unittest.TestCase):
     """Test setup with rebase_inverse parameter."""
 
-    def setUp(self):
-        self.level_data = {
-            "symmetries": {
-                "automorphisms": [
-                    {"id": "e",  "mapping": [0, 1, 2], "name": "Identity"},
-                    {"id": "r1", "mapping": [1, 2, 0], "name": "Rotation 120"},
-                    {"id": "r2", "mapping": [2, 0, 1], "name": "Rotation 240"},
-                ]
-            }
-        }
+    def test_rebase(self):
+        """Rebase by identity changes nothing; rebase by r1^-1 permutes rooms.
 
-    def test_rebase_identity(self):
-        """Rebase with identity should not change anything."""
-        rs = RoomState()
-        rs.setup(self.level_data, Permutation([0, 1, 2]))
-        self.assertEqual(rs.group_order, 3)
-        self.assertTrue(rs.all_perms[0].is_identity())
-
-    def test_rebase_by_r1(self):
-        """Rebase by r1^-1: each perm p becomes p.compose(r1^-1).
-        The identity in the original becomes r1.compose(r1^-1) = e, still identity.
-        r1 becomes r1.compose(r1^-1) = e.
-        Actually: rebase_inverse = r1^-1 = r2 = [2,0,1]
+        Rebase by r1^-1: each perm p becomes p.compose(r1^-1).
+        rebase_inverse = r1^-1 = r2 = [2,0,1]
         p.compose(rebase_inverse) means: for each i, result[i] = rebase_inverse.apply(p.apply(i))
 
         e.compose(r2) = r2 (NOT identity)
@@ -572,33 +606,30 @@ class TestRoomStateWithRebase(unittest.TestCase):
         r2.compose(r2) = r1
 
         So after rebase by r1^-1, the elements are {r2, e, r1} and identity (e)
-        moves to index 0.
+        moves to index 0. Either way the Cayley table must stay valid.
         """
-        r1 = Permutation([1, 2, 0])
-        r1_inv = r1.inverse()
-        rs = RoomState()
-        rs.setup(self.level_data, r1_inv)
-
-        self.assertEqual(rs.group_order, 3)
-        self.assertTrue(rs.all_perms[0].is_identity())
-        # Cayley table should still be valid
-        for a in range(3):
-            for b in range(3):
-                for c in range(3):
-                    ab = rs.cayley_table[a][b]
-                    ab_c = rs.cayley_table[ab][c]
-                    bc = rs.cayley_table[b][c]
-                    a_bc = rs.cayley_table[a][bc]
-                    self.assertEqual(ab_c, a_bc)
+        rebases = {
+            "identity": Permutation([0, 1, 2]),
+            "r1_inverse": Permutation([1, 2, 0]).inverse(),
+        }
+        for name, rebase_inverse in rebases.items():
+            with self.subTest(rebase=name):
+                rs = RoomState()
+                rs.setup(Z3_LEVEL_DATA, rebase_inverse)
+                self.assertEqual(rs.group_order, 3)
+                self.assertTrue(rs.all_perms[0].is_identity())
+                assert_associative(self, rs.cayley_table)
 
 
 class TestRoomStateS3Full(unittest.TestCase):
     """Test with full S3 from level_13.json."""
 
-    def setUp(self):
-        self.level_data = load_level("act2/level_13.json")
-        self.rs = RoomState()
-        self.rs.setup(self.level_data)
+    @classmethod
+    def setUpClass(cls):
+        cls.level_data = load_level("act2/level_13.json")
+        cls.rs = RoomState()
+        cls.rs.setup(cls.level_data)
+        cls.perm_idx = perm_index_by_id(cls.rs)
 
     def test_group_order(self):
         self.assertEqual(self.rs.group_order, 6)
@@ -608,27 +639,11 @@ class TestRoomStateS3Full(unittest.TestCase):
 
     def test_cayley_matches_json(self):
         """Cayley table matches JSON."""
-        json_cayley = self.level_data["symmetries"]["cayley_table"]
-        id_to_room = {sid: i for i, sid in enumerate(self.rs.perm_ids)}
-
-        for a_id, row in json_cayley.items():
-            a_idx = id_to_room[a_id]
-            for b_id, result_id in row.items():
-                b_idx = id_to_room[b_id]
-                result_idx = id_to_room[result_id]
-                computed = self.rs.cayley_table[a_idx][b_idx]
-                self.assertEqual(computed, result_idx,
-                    f"Cayley: {a_id}*{b_id}={result_id}(room {result_idx}) "
-                    f"but got room {computed}({self.rs.perm_ids[computed]})")
+        assert_cayley_matches_json(self, self.rs,
+                                   self.level_data["symmetries"]["cayley_table"])
 
     def test_associativity(self):
-        n = self.rs.group_order
-        for a in range(n):
-            for b in range(n):
-                for c in range(n):
-                    ab_c = self.rs.cayley_table[self.rs.cayley_table[a][b]][c]
-                    a_bc = self.rs.cayley_table[a][self.rs.cayley_table[b][c]]
-                    self.assertEqual(ab_c, a_bc)
+        assert_associative(self, self.rs.cayley_table)
 
 
 if __name__ == "__main__":
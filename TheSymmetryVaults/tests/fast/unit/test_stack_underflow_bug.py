@@ -29,9 +29,13 @@ Mirrors: src/game/game_manager.gd, src/game/level_scene.gd,
          src/game/hud_builder.gd
 Depends on: test_hall_tree_data.py, test_hall_progression.py
 """
+import copy
 import json
 import os
+import re
 import unittest
+from collections import Counter, deque
+from functools import lru_cache
 from pathlib import Path
 
 # Reuse Python mirrors from sibling test modules
@@ -41,6 +45,27 @@ from test_hall_progression import HallProgressionEngine, HallState
 
 # === Python mirror of GameManager.complete_level() logic ===
 
+# String.is_valid_int(): optional sign followed by ASCII digits
+_VALID_INT_RE = re.compile(r"[+-]?[0-9]+")
+
+
+@lru_cache(maxsize=256)
+def _parse_level_id_cached(level_id: str) -> dict:
+    """Parsed level id, cached per id. Callers must not mutate it.
+
+    Same steps as GameManager._parse_level_id(): split on "_", strip every
+    "act"/"level" from the first two parts, require both to be valid ints.
+    """
+    parts = level_id.split("_")
+    if len(parts) < 2:
+        return {}
+    act_str = parts[0].replace("act", "")
+    lvl_str = parts[1].replace("level", "")
+    if not _VALID_INT_RE.fullmatch(act_str) or not _VALID_INT_RE.fullmatch(lvl_str):
+        return {}
+    return {"act": int(act_str), "level": int(lvl_str)}
+
+
 class GameManagerMirror:
     """Python mirror of GameManager for stack underflow bug testing.
     Mirrors the level completion and transition logic from game_manager.gd.
@@ -49,13 +74,14 @@ class GameManagerMirror:
     def __init__(self):
         self.current_act: int = 1
         self.current_level: int = 1
-        self.completed_levels: list[str] = []
+        # Insertion-ordered set: dict keys keep completion order, O(1) lookup
+        self.completed_levels: dict[str, None] = {}
         self.level_states: dict = {}
         self.level_registry: dict[str, str] = {}
         self.hall_tree: HallTreeData | None = None
         self.progression: HallProgressionEngine | None = None
         # Track signals that would be emitted
-        self.emitted_signals: list[tuple[str, ...]] = []
+        self.emitted_signals: deque[tuple[str, ...]] = deque()
 
     def build_registry_from_hall_tree(self) -> None:
         """Build level_registry from hall_tree halls (simulates _build_level_registry)."""
@@ -68,8 +94,7 @@ class GameManagerMirror:
 
     def complete_level(self, level_id: str) -> None:
         """Mirror of GameManager.complete_level() — exact GDScript logic."""
-        if level_id not in self.completed_levels:
-            self.completed_levels.append(level_id)
+        self.completed_levels.setdefault(level_id, None)
 
         # Advance current_act / current_level to the next one
         next_info = self._parse_level_id(level_id)
@@ -77,16 +102,12 @@ class GameManagerMirror:
             act = next_info["act"]
             lvl = next_info["level"]
             # Point to the next level so game resumes there
-            next_id = "act%d_level%02d" % (act, lvl + 1)
-            if next_id in self.level_registry:
-                self.current_act = act
-                self.current_level = lvl + 1
-            else:
-                # Try first level of next act
-                next_act_id = "act%d_level%02d" % (act + 1, 1)
-                if next_act_id in self.level_registry:
-                    self.current_act = act + 1
-                    self.current_level = 1
+            next_id = self._find_successor(act, lvl)
+            if next_id is not None:
+                succ = self._parse_level_id(next_id)
+                self.current_act = succ["act"]
+                self.current_level = succ["level"]
+                if succ["act"] != act:
                     self.emitted_signals.append(("act_completed", act))
 
         # Notify progression engine about hall completion
@@ -101,31 +122,27 @@ class GameManagerMirror:
         if not info:
             return ""
 
-        act = info["act"]
-        lvl = info["level"]
+        next_id = self._find_successor(info["act"], info["level"])
+        if next_id is None:
+            return ""
+        return self.level_registry[next_id]
 
+    def _find_successor(self, act: int, lvl: int) -> str | None:
+        """Registry id of the next level in the same act, else of the first
+        level of the next act; None if neither is registered."""
         # Try next level in same act
         next_id = "act%d_level%02d" % (act, lvl + 1)
         if next_id in self.level_registry:
-            return self.level_registry[next_id]
-
+            return next_id
         # Try first level of next act
         next_act_id = "act%d_level%02d" % (act + 1, 1)
         if next_act_id in self.level_registry:
-            return self.level_registry[next_act_id]
-
-        return ""
+            return next_act_id
+        return None
 
     def _parse_level_id(self, level_id: str) -> dict:
         """Mirror of GameManager._parse_level_id()."""
-        parts = level_id.split("_")
-        if len(parts) < 2:
-            return {}
-        act_str = parts[0].replace("act", "")
-        lvl_str = parts[1].replace("level", "")
-        if not act_str.isdigit() or not lvl_str.isdigit():
-            return {}
-        return {"act": int(act_str), "level": int(lvl_str)}
+        return _parse_level_id_cached(level_id)
 
 
 class LevelSceneMirror:
@@ -133,11 +150,14 @@ class LevelSceneMirror:
     Simulates _on_level_complete, _show_complete_summary, _on_next_level_pressed.
     """
 
+    __slots__ = ("gm", "level_id", "scene_change_target",
+                 "lambda_callbacks_active_count", "is_scene_destroyed")
+
     def __init__(self, game_manager: GameManagerMirror):
         self.gm = game_manager
         self.level_id: str = ""
         self.scene_change_target: str = ""  # What scene would be loaded
-        self.lambda_callbacks_active: list[str] = []  # Track live lambdas
+        self.lambda_callbacks_active_count: int = 0  # Track live lambdas
         self.is_scene_destroyed: bool = False
 
     def on_level_complete(self, level_id: str) -> dict:
@@ -152,14 +172,13 @@ class LevelSceneMirror:
         # Step 2: create_timer(1.2) → _show_complete_summary
         # In real Godot, this creates a Timer + lambda callback
         # that fires 1.2s later. The lambda captures `self` (LevelScene).
-        self.lambda_callbacks_active.append(
-            "create_timer(1.2).timeout -> _show_complete_summary"
-        )
+        # create_timer(1.2).timeout -> _show_complete_summary
+        self.lambda_callbacks_active_count += 1
 
         return {
             "level_id": level_id,
             "completed_levels": list(self.gm.completed_levels),
-            "active_lambdas": list(self.lambda_callbacks_active),
+            "active_lambda_count": self.lambda_callbacks_active_count,
         }
 
     def show_complete_summary(self) -> dict:
@@ -169,17 +188,14 @@ class LevelSceneMirror:
         # In GDScript hud_builder.gd:284:
         #   var _s = func(n, t): var l = p.get_node_or_null(n); if l: l.text = t
         # This lambda is a closure capturing `p` (the panel).
-        self.lambda_callbacks_active.append(
-            "hud_builder._s = func(n, t): ..."
-        )
+        self.lambda_callbacks_active_count += 1
 
         # Line 304: scene.create_tween().tween_property(...)
         # The tween is owned by scene (self). When scene is freed,
         # the tween is also freed — but the VM function stack
         # may still reference it.
-        self.lambda_callbacks_active.append(
-            "scene.create_tween() -> tween_property(panel, modulate)"
-        )
+        # scene.create_tween() -> tween_property(panel, modulate)
+        self.lambda_callbacks_active_count += 1
 
         # Check: is "next level" button visible?
         next_path = self.gm.get_next_level_path(self.level_id)
@@ -191,7 +207,7 @@ class LevelSceneMirror:
             "has_hall_tree": has_hall_tree,
             "button_text": "ВЕРНУТЬСЯ НА КАРТУ" if has_hall_tree else "СЛЕДУЮЩИЙ УРОВЕНЬ  >",
             "button_visible": has_hall_tree or has_next,
-            "active_lambdas": list(self.lambda_callbacks_active),
+            "active_lambda_count": self.lambda_callbacks_active_count,
         }
 
     def on_next_level_pressed(self) -> dict:
@@ -206,7 +222,7 @@ class LevelSceneMirror:
            → For the last level, path == "" → nothing happens (orphan scene)
         """
         result = {
-            "active_lambdas_before_transition": list(self.lambda_callbacks_active),
+            "active_lambda_count_before_transition": self.lambda_callbacks_active_count,
             "transition_type": "",
             "stack_underflow_risk": False,
             "dangling_lambda_count": 0,
@@ -222,7 +238,7 @@ class LevelSceneMirror:
             # The GDScript VM still has lambda closures on the function call stack
             # (from create_timer and create_tween), but the objects they reference
             # are being freed by scene change.
-            dangling = len(self.lambda_callbacks_active)
+            dangling = self.lambda_callbacks_active_count
             result["dangling_lambda_count"] = dangling
             result["stack_underflow_risk"] = dangling > 0
 
@@ -245,11 +261,47 @@ class LevelSceneMirror:
 
 # === Load real hall_tree.json ===
 
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+_HALL_TREE_PATH = _PROJECT_ROOT / "data" / "hall_tree.json"
+
+# GDScript sources inspected by the fix-verification tests, read once at
+# import. Missing files are simply absent from _GD_SOURCES.
+_GD_SOURCE_FILES = {
+    "hud_builder.gd": Path("src") / "game" / "hud_builder.gd",
+    "map_scene.gd": Path("src") / "ui" / "map_scene.gd",
+    "feedback_fx.gd": Path("src") / "visual" / "feedback_fx.gd",
+    "level_scene.gd": Path("src") / "game" / "level_scene.gd",
+}
+_GD_SOURCES = {
+    name: (_PROJECT_ROOT / rel).read_text(encoding="utf-8")
+    for name, rel in _GD_SOURCE_FILES.items()
+    if (_PROJECT_ROOT / rel).exists()
+}
+# Substrings each test looks for, counted once per source file.
+_GD_MARKERS = {
+    "hud_builder.gd": ("tween_callback(func():", "_hide_node"),
+    "map_scene.gd": ("avoids lambda/Stack underflow", "_set_gate_label_open"),
+    "feedback_fx.gd": ("timeout.connect(func():", "_emit_feedback"),
+    "level_scene.gd": ("create_timer(1.2)", "_show_complete_summary.bind"),
+}
+_GD_MARKER_PATTERNS = {
+    name: re.compile("|".join(map(re.escape, markers)))
+    for name, markers in _GD_MARKERS.items()
+}
+# One finditer pass per file; absent markers read back as 0 from the Counter.
+# No marker is a substring of another in the same file, so this matches
+# per-marker str.count().
+_GD_MARKER_COUNTS = {
+    name: Counter(m.group(0) for m in _GD_MARKER_PATTERNS[name].finditer(src))
+    for name, src in _GD_SOURCES.items()
+}
+
+
+@lru_cache(maxsize=1)
 def _load_hall_tree() -> HallTreeData:
-    base = Path(__file__).resolve().parent.parent.parent.parent
-    path = base / "data" / "hall_tree.json"
+    """Parse hall_tree.json once per test run. Shared — callers must not mutate it."""
     ht = HallTreeData()
-    assert ht.load_from_file(str(path)), f"Failed to load {path}"
+    assert ht.load_from_file(str(_HALL_TREE_PATH)), f"Failed to load {_HALL_TREE_PATH}"
     return ht
 
 
@@ -267,6 +319,33 @@ def _build_full_game() -> tuple[GameManagerMirror, HallTreeData]:
     return gm, ht
 
 
+def _copy_progression(progression: HallProgressionEngine) -> HallProgressionEngine:
+    """Deep copy of *progression* that keeps sharing its (read-only) hall tree."""
+    return copy.deepcopy(progression, {id(progression.hall_tree): progression.hall_tree})
+
+
+def _snapshot_mutable_state(gm: GameManagerMirror) -> dict:
+    """Playthrough state of *gm*; registry and hall tree stay shared."""
+    return {
+        "current": (gm.current_act, gm.current_level),
+        "completed_levels": tuple(gm.completed_levels),
+        "emitted_signals": tuple(gm.emitted_signals),
+        "progression": _copy_progression(gm.progression),
+    }
+
+
+def _restore_mutable_state(gm: GameManagerMirror, snap: dict) -> None:
+    gm.current_act, gm.current_level = snap["current"]
+    gm.completed_levels = dict.fromkeys(snap["completed_levels"])
+    gm.emitted_signals = deque(snap["emitted_signals"])
+    gm.progression = _copy_progression(snap["progression"])
+
+
+def _count_signal_payloads(signals, name: str) -> Counter:
+    """Payload -> emission count for every *name* signal, in one pass."""
+    return Counter(s[1] for s in signals if s[0] == name)
+
+
 # === Tests ===
 
 class TestStackUnderflowBug(unittest.TestCase):
@@ -281,8 +360,31 @@ class TestStackUnderflowBug(unittest.TestCase):
     GDScript VM call stack when scene change destroys the LevelScene node.
     """
 
+    @classmethod
+    def setUpClass(cls):
+        gm, ht = _build_full_game()
+        cls._template_gm, cls._template_ht = gm, ht
+        cls._gm_attrs = frozenset(dir(gm))
+        cls._pristine_registry = dict(gm.level_registry)
+        cls._all_levels = tuple(h for w in ht.wings for h in w.halls)
+
+        # Play through once and keep snapshots of the states tests start from
+        cls._pristine = _snapshot_mutable_state(gm)
+        for level_id in cls._all_levels[:-1]:
+            gm.complete_level(level_id)
+        cls._all_but_last_completed = _snapshot_mutable_state(gm)
+        gm.complete_level(cls._all_levels[-1])
+        cls._all_completed = _snapshot_mutable_state(gm)
+
     def setUp(self):
-        self.gm, self.ht = _build_full_game()
+        # Registry and hall tree are shared read-only; tests only touch
+        # playthrough state, which is reset here.
+        self.gm, self.ht = self._template_gm, self._template_ht
+        _restore_mutable_state(self.gm, self._pristine)
+
+    def tearDown(self):
+        # The registry is shared across tests, never copied
+        self.assertEqual(self.gm.level_registry, self._pristine_registry)
 
     # ------------------------------------------------------------------
     # 1. Verify the structural precondition: no next level after last
@@ -333,20 +435,12 @@ class TestStackUnderflowBug(unittest.TestCase):
         This means the game has NO way to know the game is fully finished.
         """
         # Complete ALL levels
-        all_levels = []
-        for wing in self.ht.wings:
-            all_levels.extend(wing.halls)
-
-        for level_id in all_levels:
-            self.gm.complete_level(level_id)
+        _restore_mutable_state(self.gm, self._all_completed)
 
         # Check: act_completed should have been emitted for act 1
         # (because act2_level13 exists), but NOT for act 2
-        act_completed_signals = [
-            s for s in self.gm.emitted_signals if s[0] == "act_completed"
-        ]
-
-        act_completed_acts = [s[1] for s in act_completed_signals]
+        act_completed_acts = _count_signal_payloads(
+            self.gm.emitted_signals, "act_completed")
 
         # act 1 completed IS emitted (act2 levels exist)
         # But this happens when act1_level12 is completed
@@ -376,13 +470,9 @@ class TestStackUnderflowBug(unittest.TestCase):
         8. → Stack underflow!
         """
         # Pre-complete all levels except the last one
-        all_levels = []
-        for wing in self.ht.wings:
-            all_levels.extend(wing.halls)
-        for level_id in all_levels[:-1]:
-            self.gm.complete_level(level_id)
+        _restore_mutable_state(self.gm, self._all_but_last_completed)
 
-        last_level = all_levels[-1]
+        last_level = self._all_levels[-1]
         self.assertEqual(last_level, "act2_level16")
 
         # Simulate the full completion flow
@@ -390,7 +480,7 @@ class TestStackUnderflowBug(unittest.TestCase):
         complete_result = scene.on_level_complete(last_level)
 
         # Verify lambdas are active after completion
-        self.assertGreater(len(complete_result["active_lambdas"]), 0,
+        self.assertGreater(complete_result["active_lambda_count"], 0,
                            "Timer lambda should be active after _on_level_complete()")
 
         # Show summary (fires after 1.2s timer)
@@ -401,7 +491,7 @@ class TestStackUnderflowBug(unittest.TestCase):
         self.assertEqual(summary_result["button_text"], "ВЕРНУТЬСЯ НА КАРТУ")
 
         # Verify: there are live lambdas (tween + timer)
-        self.assertGreater(len(summary_result["active_lambdas"]), 1,
+        self.assertGreater(summary_result["active_lambda_count"], 1,
                            "Multiple lambdas should be active: timer + tween + _s helper")
 
         # THE BUG: Player presses the button → scene transition with live lambdas
@@ -419,7 +509,7 @@ class TestStackUnderflowBug(unittest.TestCase):
         # Verify the scene was destroyed while lambdas were live
         self.assertTrue(scene.is_scene_destroyed,
                         "Scene must be destroyed during transition")
-        self.assertGreater(len(scene.lambda_callbacks_active), 0,
+        self.assertGreater(scene.lambda_callbacks_active_count, 0,
                            "Lambdas must still be in the list when scene is destroyed "
                            "— they can't clean themselves up during change_scene_to_file()")
 
@@ -436,13 +526,13 @@ class TestStackUnderflowBug(unittest.TestCase):
         # Complete first level
         scene.on_level_complete("act1_level01")
         scene.show_complete_summary()
-        lambdas_after_1 = len(scene.lambda_callbacks_active)
+        lambdas_after_1 = scene.lambda_callbacks_active_count
         self.assertGreater(lambdas_after_1, 0)
 
         # Complete second level (without scene recreation)
         scene.on_level_complete("act1_level02")
         scene.show_complete_summary()
-        lambdas_after_2 = len(scene.lambda_callbacks_active)
+        lambdas_after_2 = scene.lambda_callbacks_active_count
 
         # Lambdas should accumulate
         self.assertGreater(lambdas_after_2, lambdas_after_1,
@@ -461,14 +551,10 @@ class TestStackUnderflowBug(unittest.TestCase):
         This missing guard is what allows the broken transition to occur.
         """
         # Complete all levels
-        all_levels = []
-        for wing in self.ht.wings:
-            all_levels.extend(wing.halls)
-        for level_id in all_levels:
-            self.gm.complete_level(level_id)
+        _restore_mutable_state(self.gm, self._all_completed)
 
         # Check: all halls are completed
-        self.assertEqual(len(self.gm.completed_levels), len(all_levels))
+        self.assertEqual(len(self.gm.completed_levels), len(self._all_levels))
 
         # Check: no next level exists
         next_path = self.gm.get_next_level_path("act2_level16")
@@ -482,8 +568,7 @@ class TestStackUnderflowBug(unittest.TestCase):
 
         # BUG: There's no 'is_game_finished()' method in GameManager
         # This is the missing guard that would prevent Stack underflow.
-        has_game_finished_check = hasattr(self.gm, 'is_game_finished')
-        self.assertFalse(has_game_finished_check,
+        self.assertNotIn('is_game_finished', self._gm_attrs,
                          "BUG CONFIRMED: GameManager has no is_game_finished() method. "
                          "This missing guard allows the broken transition flow.")
 
@@ -537,22 +622,19 @@ class TestStackUnderflowBug(unittest.TestCase):
         Now extracted to a proper static method _hide_node(), following the
         same pattern as map_scene.gd:792 (_set_gate_label_open).
         """
-        base = Path(__file__).resolve().parent.parent.parent.parent
-        hud_builder_path = base / "src" / "game" / "hud_builder.gd"
+        self.assertIn("hud_builder.gd", _GD_SOURCES,
+                      "hud_builder.gd must exist")
 
-        self.assertTrue(hud_builder_path.exists(),
-                        "hud_builder.gd must exist")
-
-        source = hud_builder_path.read_text(encoding="utf-8")
+        markers = _GD_MARKER_COUNTS["hud_builder.gd"]
 
         # Lambda in tween_callback should be gone
-        self.assertNotIn("tween_callback(func():", source,
+        self.assertEqual(markers["tween_callback(func():"], 0,
                          "FIX VERIFIED: hud_builder.gd no longer uses lambda in "
                          "tween_callback — extracted to _hide_node() method.")
 
         # The safe helper method should exist
-        self.assertIn("_hide_node", source,
-                      "hud_builder.gd should have _hide_node() helper method.")
+        self.assertGreater(markers["_hide_node"], 0,
+                           "hud_builder.gd should have _hide_node() helper method.")
 
     # ------------------------------------------------------------------
     # 8. Verify the fix pattern exists (map_scene.gd already fixed one)
@@ -561,20 +643,17 @@ class TestStackUnderflowBug(unittest.TestCase):
     def test_fix_pattern_documented_in_map_scene(self):
         """Verify that map_scene.gd already documents the fix pattern
         in its comment on _set_gate_label_open()."""
-        base = Path(__file__).resolve().parent.parent.parent.parent
-        map_scene_path = base / "src" / "ui" / "map_scene.gd"
-
-        self.assertTrue(map_scene_path.exists())
+        self.assertIn("map_scene.gd", _GD_SOURCES)
 
-        source = map_scene_path.read_text(encoding="utf-8")
+        markers = _GD_MARKER_COUNTS["map_scene.gd"]
 
         # The fix pattern comment must exist
-        self.assertIn("avoids lambda/Stack underflow", source,
-                      "map_scene.gd should document the Stack underflow fix pattern")
+        self.assertGreater(markers["avoids lambda/Stack underflow"], 0,
+                           "map_scene.gd should document the Stack underflow fix pattern")
 
         # The safe callback method must exist
-        self.assertIn("_set_gate_label_open", source,
-                      "map_scene.gd should have the extracted callback method")
+        self.assertGreater(markers["_set_gate_label_open"], 0,
+                           "map_scene.gd should have the extracted callback method")
 
     # ------------------------------------------------------------------
     # 9. Complete all Act 1 levels — transition to Act 2 should work
@@ -597,10 +676,9 @@ class TestStackUnderflowBug(unittest.TestCase):
             self.gm.complete_level(level_id)
 
         # act_completed should NOT be emitted (this is the bug)
-        act_completed = [s for s in self.gm.emitted_signals
-                         if s[0] == "act_completed"]
-        act1_completed = [s for s in act_completed if s[1] == 1]
-        self.assertEqual(len(act1_completed), 0,
+        act_completed = _count_signal_payloads(
+            self.gm.emitted_signals, "act_completed")
+        self.assertEqual(act_completed[1], 0,
                          "BUG CONFIRMED: act_completed(1) is NEVER emitted "
                          "because act2 levels don't follow the expected naming "
                          "convention (act2_level01). Act1 → Act2 linear transition "
@@ -656,23 +734,20 @@ class TestStackUnderflowRootCause(unittest.TestCase):
         The named method _emit_feedback() avoids dangling closures during
         scene transitions.
         """
-        base = Path(__file__).resolve().parent.parent.parent.parent
-        fx_path = base / "src" / "visual" / "feedback_fx.gd"
-
-        if not fx_path.exists():
+        if "feedback_fx.gd" not in _GD_SOURCES:
             self.skipTest("feedback_fx.gd not found")
 
-        source = fx_path.read_text(encoding="utf-8")
+        markers = _GD_MARKER_COUNTS["feedback_fx.gd"]
 
         # Lambda timer callbacks should be gone
-        lambda_count = source.count("timeout.connect(func():")
+        lambda_count = markers["timeout.connect(func():"]
         self.assertEqual(lambda_count, 0,
                          "FIX VERIFIED: feedback_fx.gd no longer uses lambda timer callbacks. "
                          f"Found {lambda_count} instance(s) — should be 0.")
 
         # The safe helper method should exist
-        self.assertIn("_emit_feedback", source,
-                      "feedback_fx.gd should have _emit_feedback() helper method.")
+        self.assertGreater(markers["_emit_feedback"], 0,
+                           "feedback_fx.gd should have _emit_feedback() helper method.")
 
     def test_level_scene_timer_in_on_level_complete(self):
         """level_scene.gd:299 creates a timer with .bind() callback:
@@ -685,20 +760,17 @@ class TestStackUnderflowRootCause(unittest.TestCase):
         during the 1.2s delay, _show_complete_summary is called on a
         freed object.
         """
-        base = Path(__file__).resolve().parent.parent.parent.parent
-        level_scene_path = base / "src" / "game" / "level_scene.gd"
-
-        source = level_scene_path.read_text(encoding="utf-8")
+        markers = _GD_MARKER_COUNTS["level_scene.gd"]
 
-        self.assertIn("create_timer(1.2)", source,
-                      "level_scene.gd should have the 1.2s timer for summary")
+        self.assertGreater(markers["create_timer(1.2)"], 0,
+                           "level_scene.gd should have the 1.2s timer for summary")
 
         # The timer fires AFTER completion but BEFORE the player can press
         # "next level". This is safe timing-wise. BUT if the player somehow
         # triggers a scene change during this 1.2s window (e.g., pressing
         # Android back button), the callback fires on a freed node.
-        self.assertIn("_show_complete_summary.bind", source,
-                      "Timer callback should use .bind() (method reference)")
+        self.assertGreater(markers["_show_complete_summary.bind"], 0,
+                           "Timer callback should use .bind() (method reference)")
 
 
 if __name__ == "__main__":
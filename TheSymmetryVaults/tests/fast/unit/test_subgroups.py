@@ -5,17 +5,56 @@ Python mirrors of GDScript logic for executable verification.
 Tests validate the mathematical correctness for Act 2 subgroup mechanics.
 """
 import itertools
+import math
 import unittest
+from functools import lru_cache
 
 
 # === Python mirrors of GDScript classes ===
 
+_PACK_LIMIT = 8
+
+
+def _pack(mapping: tuple):
+    """Equality/hash key for a mapping: one int (a byte per point, fits a
+    uint64) for up to _PACK_LIMIT points, the tuple itself beyond that or
+    when an entry is outside 0..255 (an invalid mapping must still build)."""
+    if len(mapping) <= _PACK_LIMIT:
+        try:
+            return int.from_bytes(bytes(mapping), "little")
+        except ValueError:
+            pass
+    return mapping
+
+
+_IDENTITY_KEYS: dict[int, object] = {}
+
+
+def _identity_key(n: int):
+    key = _IDENTITY_KEYS.get(n)
+    if key is None:
+        key = _IDENTITY_KEYS[n] = _pack(tuple(range(n)))
+    return key
+
+
 class Permutation:
+    # Immutable: mapping is a tuple and _packed its integer key, so equality
+    # is one int compare and instances can be set members / dict keys.
     def __init__(self, mapping: list[int]):
-        self.mapping = list(mapping)
+        self.mapping = tuple(mapping)
+        self._packed = _pack(self.mapping)
+        self._n = len(self.mapping)
+        self._is_identity = self._packed == _identity_key(self._n)
+        self._inv: "Permutation | None" = None
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Permutation) and self._packed == other._packed
+
+    def __hash__(self) -> int:
+        return hash(self._packed)
 
     def size(self) -> int:
-        return len(self.mapping)
+        return self._n
 
     def apply(self, i: int) -> int:
         return self.mapping[i]
@@ -25,29 +64,39 @@ class Permutation:
         return n > 0 and sorted(self.mapping) == list(range(n))
 
     def is_identity(self) -> bool:
-        return all(self.mapping[i] == i for i in range(self.size()))
+        return self._is_identity
 
     def compose(self, other: "Permutation") -> "Permutation":
         assert self.size() == other.size()
-        return Permutation([other.apply(self.apply(i)) for i in range(self.size())])
+        # (self then other)[i] = other[self[i]], gathered at C level
+        return Permutation(map(other.mapping.__getitem__, self.mapping))
 
     def inverse(self) -> "Permutation":
-        inv = [0] * self.size()
-        for i, v in enumerate(self.mapping):
-            inv[v] = i
-        return Permutation(inv)
+        if self._inv is None:
+            # argsort of the mapping: inv[mapping[i]] = i
+            inv = Permutation(sorted(range(self._n), key=self.mapping.__getitem__))
+            inv._inv = self
+            self._inv = inv
+        return self._inv
 
     def order(self) -> int:
-        current = self
-        identity = Permutation.create_identity(self.size())
-        for k in range(1, 1000):
-            if current.equals(identity):
-                return k
-            current = current.compose(self)
-        return -1
+        """LCM of the cycle lengths — exact, no repeated composition."""
+        visited = [False] * self.size()
+        lengths = []
+        for i in range(self.size()):
+            if visited[i]:
+                continue
+            length = 0
+            j = i
+            while not visited[j]:
+                visited[j] = True
+                j = self.mapping[j]
+                length += 1
+            lengths.append(length)
+        return math.lcm(*lengths) if lengths else 1
 
     def equals(self, other: "Permutation") -> bool:
-        return self.mapping == other.mapping
+        return self is other or self._packed == other._packed
 
     def to_cycle_notation(self) -> str:
         visited = set()
@@ -67,12 +116,22 @@ class Permutation:
 
     def is_in_group(self, group: list["Permutation"]) -> bool:
         """Check if this permutation belongs to the given group."""
-        return any(self.equals(g) for g in group)
+        return self in group
 
     @staticmethod
     def create_identity(n: int) -> "Permutation":
         return Permutation(list(range(n)))
 
+    @staticmethod
+    def conjugate(g: "Permutation", h: "Permutation",
+                  g_inv: "Permutation | None" = None) -> "Permutation":
+        """g·h·g⁻¹ in one fused gather: result[i] = g⁻¹[h[g[i]]].
+        Same as g.compose(h).compose(g_inv) without the intermediate."""
+        if g_inv is None:
+            g_inv = g.inverse()
+        return Permutation(map(g_inv.mapping.__getitem__,
+                               map(h.mapping.__getitem__, g.mapping)))
+
     @staticmethod
     def compose_list(perms: list["Permutation"], n: int = 0) -> "Permutation":
         """Compose a list of permutations left-to-right."""
@@ -85,33 +144,34 @@ class Permutation:
 
     @staticmethod
     def generate_subgroup_from(generators: list["Permutation"], n: int) -> list["Permutation"]:
-        """Generate the subgroup from given generators via iterative closure."""
-        subgroup = [Permutation.create_identity(n)]
+        """Generate the subgroup from given generators via BFS closure.
 
+        Only newly reached elements are multiplied by the generators, so every
+        product is formed once. In a finite group closure under composition
+        already yields inverses.
+        """
+        subgroup = [Permutation.create_identity(n)]
+        seen = {subgroup[0].mapping}
+        gens = []
         for gen in generators:
-            if not any(s.equals(gen) for s in subgroup):
+            if gen.mapping not in seen:
+                seen.add(gen.mapping)
                 subgroup.append(gen)
-
-        changed = True
-        while changed:
-            changed = False
-            to_add = []
-            # Close under composition
-            for a in subgroup:
-                for b in subgroup:
-                    product = a.compose(b)
-                    if not any(s.equals(product) for s in subgroup) and \
-                       not any(t.equals(product) for t in to_add):
-                        to_add.append(product)
-            # Close under inverse
-            for a in subgroup:
-                inv = a.inverse()
-                if not any(s.equals(inv) for s in subgroup) and \
-                   not any(t.equals(inv) for t in to_add):
-                    to_add.append(inv)
-            if to_add:
-                subgroup.extend(to_add)
-                changed = True
+                gens.append(gen)
+
+        # The BFS runs on raw mapping tuples; a Permutation is only built for
+        # elements not seen before. h.compose(g)[i] == g[h[i]].
+        gen_lookups = [g.mapping.__getitem__ for g in gens]
+        frontier = [g.mapping for g in gens]
+        while frontier:
+            next_frontier = []
+            for h, lookup in itertools.product(frontier, gen_lookups):
+                product = tuple(map(lookup, h))
+                if product not in seen:
+                    seen.add(product)
+                    subgroup.append(Permutation(product))
+                    next_frontier.append(product)
+            frontier = next_frontier
 
         return subgroup
 
@@ -120,24 +180,24 @@ class KeyRing:
     def __init__(self, target_count: int = 0):
         self.found: list[Permutation] = []
         self.target_count = target_count
+        # mapping -> index into found, kept in step by add_key
+        self._index: dict[tuple[int, ...], int] = {}
 
     def add_key(self, p: Permutation) -> bool:
         if self.contains(p):
             return False
+        self._index[p.mapping] = len(self.found)
         self.found.append(p)
         return True
 
     def contains(self, p: Permutation) -> bool:
-        return any(k.equals(p) for k in self.found)
+        return p.mapping in self._index
 
     def count(self) -> int:
         return len(self.found)
 
     def _index_of(self, p: Permutation) -> int:
-        for i, f in enumerate(self.found):
-            if f.equals(p):
-                return i
-        return -1
+        return self._index.get(p.mapping, -1)
 
     def check_subgroup(self, key_indices: list[int]) -> dict:
         """Check whether subset of keys forms a subgroup."""
@@ -149,23 +209,27 @@ class KeyRing:
             result["is_subgroup"] = False
             result["reasons"].append("missing_identity")
 
+        members = {p.mapping for p in subset}
+        missing_seen: set[tuple[int, ...]] = set()
+
         # Composition closure check
-        for a in subset:
-            for b in subset:
-                product = a.compose(b)
-                if not any(s.equals(product) for s in subset):
-                    result["is_subgroup"] = False
-                    if not any(m.equals(product) for m in result["missing_elements"]):
-                        result["missing_elements"].append(product)
-                    if "not_closed_composition" not in result["reasons"]:
-                        result["reasons"].append("not_closed_composition")
+        for a, b in itertools.product(subset, repeat=2):
+            product = a.compose(b)
+            if product.mapping not in members:
+                result["is_subgroup"] = False
+                if product.mapping not in missing_seen:
+                    missing_seen.add(product.mapping)
+                    result["missing_elements"].append(product)
+                if "not_closed_composition" not in result["reasons"]:
+                    result["reasons"].append("not_closed_composition")
 
         # Inverse closure check
         for a in subset:
             inv = a.inverse()
-            if not any(s.equals(inv) for s in subset):
+            if inv.mapping not in members:
                 result["is_subgroup"] = False
-                if not any(m.equals(inv) for m in result["missing_elements"]):
+                if inv.mapping not in missing_seen:
+                    missing_seen.add(inv.mapping)
                     result["missing_elements"].append(inv)
                 if "missing_inverse" not in result["reasons"]:
                     result["reasons"].append("missing_inverse")
@@ -188,38 +252,59 @@ class KeyRing:
         return result_indices
 
     def find_all_subgroups(self) -> list[dict]:
-        """Find all subgroups among the found keys by full subset enumeration."""
+        """Find all subgroups among the found keys by full subset enumeration.
+
+        Products and inverses are resolved to indices into found[] once
+        (index n stands for "not a found key"); each subset is then a bitmask
+        and closure is checked with bit tests instead of compositions.
+        """
         n = len(self.found)
         if n == 0:
             return []
+        found = self.found
+        index = {p.mapping: i for i, p in enumerate(found)}
+        mul = [[index.get(a.compose(b).mapping, n) for b in found] for a in found]
+        inv = [index.get(a.inverse().mapping, n) for a in found]
+        identity_bits = 0
+        for i, p in enumerate(found):
+            if p.is_identity():
+                identity_bits |= 1 << i
+
         subgroups = []
         for mask in range(1, 1 << n):
-            subset = []
-            indices = []
-            for bit in range(n):
-                if mask & (1 << bit):
-                    subset.append(self.found[bit])
-                    indices.append(bit)
-            if self._is_subset_subgroup(subset):
+            if not mask & identity_bits:
+                continue
+            indices = [bit for bit in range(n) if mask >> bit & 1]
+            if self._is_mask_closed(mask, indices, mul, inv):
                 subgroups.append({
                     "indices": indices,
-                    "order": len(subset),
-                    "elements": subset
+                    "order": len(indices),
+                    "elements": [found[i] for i in indices]
                 })
         return subgroups
 
+    @staticmethod
+    def _is_mask_closed(mask: int, indices: list[int],
+                        mul: list[list[int]], inv: list[int]) -> bool:
+        for i in indices:
+            if not mask >> inv[i] & 1:
+                return False
+            row = mul[i]
+            for j in indices:
+                if not mask >> row[j] & 1:
+                    return False
+        return True
+
     @staticmethod
     def _is_subset_subgroup(subset: list[Permutation]) -> bool:
         if not any(p.is_identity() for p in subset):
             return False
+        members = {p.mapping for p in subset}
+        for a, b in itertools.product(subset, repeat=2):
+            if a.compose(b).mapping not in members:
+                return False
         for a in subset:
-            for b in subset:
-                product = a.compose(b)
-                if not any(s.equals(product) for s in subset):
-                    return False
-        for a in subset:
-            inv = a.inverse()
-            if not any(s.equals(inv) for s in subset):
+            if a.inverse().mapping not in members:
                 return False
         return True
 
@@ -227,12 +312,16 @@ class KeyRing:
 class SubgroupChecker:
     @staticmethod
     def is_normal(subgroup: list[Permutation], group: list[Permutation]) -> bool:
-        """Check if subgroup H is normal in group G: ∀g∈G, ∀h∈H: g·h·g⁻¹ ∈ H"""
+        """Check if subgroup H is normal in group G: ∀g∈G, ∀h∈H: g·h·g⁻¹ ∈ H
+
+        Conjugating by a product is the product of conjugations, so checking
+        a generating set of G would suffice; callers pass all of G here.
+        """
+        sub_set = {h.mapping for h in subgroup}
         for g in group:
             g_inv = g.inverse()
             for h in subgroup:
-                conjugate = g.compose(h).compose(g_inv)
-                if not any(s.equals(conjugate) for s in subgroup):
+                if Permutation.conjugate(g, h, g_inv).mapping not in sub_set:
                     return False
         return True
 
@@ -241,16 +330,18 @@ class SubgroupChecker:
                             group: list[Permutation]) -> list[list[Permutation]]:
         """Compute left coset decomposition of G by H."""
         cosets = []
-        assigned = []
+        assigned = set()
         for g in group:
-            if any(a.equals(g) for a in assigned):
+            if g.mapping in assigned:
                 continue
             coset = []
             for h in subgroup:
                 element = g.compose(h)
                 coset.append(element)
-                assigned.append(element)
+                assigned.add(element.mapping)
             cosets.append(coset)
+            if len(assigned) == len(group):
+                break  # every element of G is in some coset
         return cosets
 
     @staticmethod
@@ -261,22 +352,29 @@ class SubgroupChecker:
         n = group[0].size()
         all_subgroups = []
         seen_signatures = set()
+        # Element sets of all_subgroups, so inclusion is a frozenset <= test
+        sig_sets = []
 
-        candidate_gen_sets = []
-        # Single generators
-        for g in group:
-            candidate_gen_sets.append([g])
-        # Pairs
-        for i in range(len(group)):
-            for j in range(i + 1, len(group)):
-                candidate_gen_sets.append([group[i], group[j]])
-
-        for gens in candidate_gen_sets:
-            sub = Permutation.generate_subgroup_from(gens, n)
+        def add_closure(gens: list[Permutation]) -> None:
+            sub = list(_closure_cached(frozenset(g.mapping for g in gens), n))
             sig = _subgroup_signature(sub)
             if sig not in seen_signatures:
                 seen_signatures.add(sig)
                 all_subgroups.append(sub)
+                sig_sets.append(sig)
+
+        # Single generators
+        for g in group:
+            add_closure([g])
+        # Pairs. If one generator already lies in the other's cyclic
+        # subgroup, the pair generates that cyclic subgroup — seen above.
+        cyclic = [{p.mapping for p in _closure_cached(frozenset([g.mapping]), n)}
+                  for g in group]
+        for i in range(len(group)):
+            for j in range(i + 1, len(group)):
+                if group[i].mapping in cyclic[j] or group[j].mapping in cyclic[i]:
+                    continue
+                add_closure([group[i], group[j]])
 
         subgroup_info = [{"elements": sub, "order": len(sub)} for sub in all_subgroups]
 
@@ -288,7 +386,10 @@ class SubgroupChecker:
                     continue
                 if len(all_subgroups[i]) >= len(all_subgroups[j]):
                     continue
-                if _is_subset_of(all_subgroups[i], all_subgroups[j]):
+                # Lagrange: a subgroup's order divides the containing order
+                if len(all_subgroups[j]) % len(all_subgroups[i]) != 0:
+                    continue
+                if sig_sets[i] <= sig_sets[j]:
                     # Check directness
                     is_direct = True
                     for k in range(len(all_subgroups)):
@@ -296,8 +397,8 @@ class SubgroupChecker:
                             continue
                         if (len(all_subgroups[k]) > len(all_subgroups[i]) and
                                 len(all_subgroups[k]) < len(all_subgroups[j]) and
-                                _is_subset_of(all_subgroups[i], all_subgroups[k]) and
-                                _is_subset_of(all_subgroups[k], all_subgroups[j])):
+                                sig_sets[i] <= sig_sets[k] and
+                                sig_sets[k] <= sig_sets[j]):
                             is_direct = False
                             break
                     if is_direct:
@@ -306,16 +407,17 @@ class SubgroupChecker:
         return {"subgroups": subgroup_info, "inclusions": inclusions}
 
 
-def _subgroup_signature(sub: list[Permutation]) -> str:
-    mappings = sorted(",".join(str(v) for v in p.mapping) for p in sub)
-    return "|".join(mappings)
+@lru_cache(maxsize=None)
+def _closure_cached(gens_key: frozenset, n: int) -> tuple[Permutation, ...]:
+    """Subgroup generated by the mappings in gens_key, memoized per generator
+    set. The closure depends only on the generators, never on the ambient
+    group, so the cache stays valid across groups."""
+    gens = [Permutation(m) for m in sorted(gens_key)]
+    return tuple(Permutation.generate_subgroup_from(gens, n))
 
 
-def _is_subset_of(sub_a: list[Permutation], sub_b: list[Permutation]) -> bool:
-    for a in sub_a:
-        if not any(b.equals(a) for b in sub_b):
-            return False
-    return True
+def _subgroup_signature(sub: list[Permutation]) -> frozenset:
+    return frozenset(p.mapping for p in sub)
 
 
 # === Helper: build S3 group ===
@@ -325,6 +427,11 @@ def build_s3() -> list[Permutation]:
     return [Permutation(list(p)) for p in itertools.permutations(range(3))]
 
 
+def build_s4() -> list[Permutation]:
+    """All 24 permutations of S4."""
+    return [Permutation(list(p)) for p in itertools.permutations(range(4))]
+
+
 def build_z3() -> list[Permutation]:
     """Z3 = {e, (0 1 2), (0 2 1)} as rotations."""
     return [
@@ -429,6 +536,43 @@ class TestPermutationExtensions(unittest.TestCase):
         self.assertEqual(len(sub), 1)
         self.assertTrue(sub[0].is_identity())
 
+    def test_order_matches_repeated_composition_s4(self):
+        """Cycle-length LCM order equals the smallest k with p^k = e"""
+        for p in build_s4():
+            with self.subTest(p=p.mapping):
+                k, power = 1, p
+                while not power.is_identity():
+                    power = power.compose(p)
+                    k += 1
+                self.assertEqual(p.order(), k)
+
+    def test_inverse_s4(self):
+        """p·p⁻¹ = p⁻¹·p = e, and the cached inverse points back to p"""
+        for p in build_s4():
+            with self.subTest(p=p.mapping):
+                inv = p.inverse()
+                self.assertTrue(p.compose(inv).is_identity())
+                self.assertTrue(inv.compose(p).is_identity())
+                self.assertIs(p.inverse(), inv)
+                self.assertIs(inv.inverse(), p)
+
+    def test_conjugate_matches_compose_s4(self):
+        """Fused conjugate equals g.compose(h).compose(g⁻¹)"""
+        s4 = build_s4()
+        for g, h in itertools.product(s4, repeat=2):
+            self.assertEqual(Permutation.conjugate(g, h),
+                             g.compose(h).compose(g.inverse()))
+
+    def test_closure_cached_matches_generate_s4(self):
+        """Memoized closure equals a fresh generate_subgroup_from"""
+        r = Permutation([1, 2, 3, 0])
+        s = Permutation([1, 0, 2, 3])
+        for gens in ([r], [s], [r, s]):
+            key = frozenset(g.mapping for g in gens)
+            expected = {p.mapping for p in Permutation.generate_subgroup_from(gens, 4)}
+            self.assertEqual({p.mapping for p in _closure_cached(key, 4)}, expected)
+        self.assertEqual(len(_closure_cached(frozenset([r.mapping, s.mapping]), 4)), 24)
+
 
 class TestKeyRingSubgroups(unittest.TestCase):
     """Tests for KeyRing subgroup methods: check_subgroup, get_subgroup_closure, find_all_subgroups"""
@@ -550,6 +694,24 @@ class TestKeyRingSubgroups(unittest.TestCase):
         orders = sorted([s["order"] for s in subgroups])
         self.assertEqual(orders, [1, 3])
 
+    def test_find_all_subgroups_matches_subset_check(self):
+        """Bitmask search agrees with the direct _is_subset_subgroup check
+        (the key_ring.gd algorithm), also for a ring missing some products."""
+        full = self._build_s3_keyring()
+        partial = KeyRing(6)
+        for p in (Permutation([0, 1, 2]), Permutation([1, 2, 0]), Permutation([0, 2, 1])):
+            partial.add_key(p)
+        for name, kr in (("S3", full), ("partial", partial)):
+            with self.subTest(ring=name):
+                expected = [
+                    list(indices)
+                    for size in range(1, kr.count() + 1)
+                    for indices in itertools.combinations(range(kr.count()), size)
+                    if KeyRing._is_subset_subgroup([kr.found[i] for i in indices])
+                ]
+                found = [s["indices"] for s in kr.find_all_subgroups()]
+                self.assertEqual(sorted(found), sorted(expected))
+
 
 class TestSubgroupChecker(unittest.TestCase):
     """Tests for SubgroupChecker: is_normal, coset_decomposition, lattice"""
@@ -687,6 +849,14 @@ class TestEdgeCases(unittest.TestCase):
         result = kr.find_all_subgroups()
         self.assertEqual(result, [])
 
+    def test_out_of_range_mapping_constructs_invalid(self):
+        """Entries outside 0..255 build a Permutation that is_valid() rejects"""
+        for mapping in ([-1, 0], [0, 300]):
+            with self.subTest(mapping=mapping):
+                p = Permutation(mapping)
+                self.assertFalse(p.is_valid())
+                self.assertEqual(p, Permutation(mapping))
+
     def test_single_element_identity_is_subgroup(self):
         kr = KeyRing(1)
         kr.add_key(Permutation.create_identity(3))
@@ -11,8 +11,9 @@
 
 import json
 import math
+from functools import lru_cache
 from itertools import permutations, combinations
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, NamedTuple, Tuple, Optional
 
 # ============================================================================
 # Доступные цвета и типы рёбер
@@ -21,10 +22,154 @@ from typing import List, Dict, Tuple, Optional
 COLORS = ["red", "blue", "green", "yellow", "purple", "orange", "cyan", "pink", "white", "black"]
 EDGE_TYPES = ["standard", "glowing", "thick", "dashed"]
 
+# Подписи узлов: A, B, C, ...
+_LABELS = tuple(chr(c) for c in range(65, 65 + 64))
+
+
+def _label(i: int) -> str:
+    """Подпись узла i; за пределами таблицы считается как раньше, chr(65 + i)"""
+    return _LABELS[i] if i < len(_LABELS) else chr(65 + i)
+
+# ============================================================================
+# Геометрия многогранников
+# ============================================================================
+
+# Позиции в форме тетраэдра
+_TET_POSITIONS = (
+    (640, 200),   # Верхняя
+    (400, 500),   # Левая нижняя
+    (880, 500),   # Правая нижняя
+    (640, 650),   # Задняя нижняя
+)
+_TET_COLORS = ("red", "blue", "green", "yellow")
+
+# Позиции для куба (вид сверху с перспективой)
+_CUBE_POSITIONS = (
+    (400, 200), (800, 200),  # Верхняя грань
+    (800, 400), (400, 400),
+    (350, 280), (850, 280),  # Нижняя грань (со смещением для перспективы)
+    (850, 480), (350, 480),
+)
+_CUBE_COLORS = ("red", "red", "blue", "blue", "green", "green", "yellow", "yellow")
+
+_OCT_POSITIONS = (
+    (640, 150),   # Верхняя
+    (400, 300), (880, 300),  # Средний пояс (4 вершины)
+    (400, 500), (880, 500),
+    (640, 650),   # Нижняя
+)
+_OCT_COLORS = ("red", "blue", "blue", "green", "green", "yellow")
+
+_CUBE_EDGES = (
+    # Верхняя грань
+    (0, 1), (1, 2), (2, 3), (3, 0),
+    # Нижняя грань
+    (4, 5), (5, 6), (6, 7), (7, 4),
+    # Вертикальные рёбра
+    (0, 4), (1, 5), (2, 6), (3, 7),
+)
+
+_OCT_EDGES = (
+    # От верхней к поясу
+    (0, 1), (0, 2), (0, 3), (0, 4),
+    # Внутри пояса
+    (1, 2), (2, 4), (4, 3), (3, 1),
+    # От пояса к нижней
+    (1, 5), (2, 5), (3, 5), (4, 5),
+)
+
 # ============================================================================
 # Утилиты для генерации групп
 # ============================================================================
 
+def _even_permutations(n: int):
+    """
+    Четные перестановки range(n) в лексикографическом порядке.
+
+    Выбор элемента ранга r среди оставшихся добавляет r инверсий, поэтому
+    чётность ведётся одним XOR. Для последних двух позиций допустим ровно
+    один порядок, так что нечетные перестановки не строятся вовсе.
+    """
+    def extend(prefix, remaining, parity):
+        if len(remaining) == 2:
+            a, b = remaining
+            yield tuple(prefix) + ((a, b) if parity == 0 else (b, a))
+            return
+        for r, x in enumerate(remaining):
+            prefix.append(x)
+            yield from extend(prefix, remaining[:r] + remaining[r + 1:], parity ^ (r & 1))
+            prefix.pop()
+
+    if n < 2:
+        yield tuple(range(n))
+        return
+    yield from extend([], list(range(n)), 0)
+
+
+@lru_cache(maxsize=None)
+def _polygon_positions(n: int, center_x: int = 640, center_y: int = 360,
+                       radius: int = 200) -> Tuple[Tuple[int, int], ...]:
+    """Вершины правильного n-угольника по кругу, начиная сверху (один раз на n)"""
+    return tuple(
+        (int(center_x + radius * math.cos(angle)), int(center_y + radius * math.sin(angle)))
+        for angle in (2 * math.pi * i / n - math.pi / 2 for i in range(n))
+    )
+
+
+@lru_cache(maxsize=None)
+def _rotation_table(n: int) -> Tuple[Tuple[int, ...], ...]:
+    """Циклические сдвиги (i + k) % n для k = 0..n-1 - срезы удвоенного range(n)"""
+    doubled = tuple(range(n)) * 2
+    return tuple(doubled[k:k + n] for k in range(n))
+
+
+@lru_cache(maxsize=None)
+def _symmetric_table(n: int) -> Tuple[Tuple[int, ...], ...]:
+    """Все перестановки range(n) в лексикографическом порядке (один раз на n)"""
+    return tuple(permutations(range(n)))
+
+
+@lru_cache(maxsize=None)
+def _alternating_table(n: int) -> Tuple[Tuple[int, ...], ...]:
+    """Четные перестановки range(n) в лексикографическом порядке (один раз на n)"""
+    return tuple(_even_permutations(n))
+
+
+class AutoTable(NamedTuple):
+    """
+    Автоморфизмы группы в виде параллельных столбцов (structure of arrays).
+
+    mappings хранит кортежи перестановок (для S_n/A_n - прямо из общих
+    таблиц), а словари в формате игры собираются только в to_json_list().
+    """
+    mappings: Tuple[Tuple[int, ...], ...]
+    ids: Tuple[str, ...]
+    names: Tuple[str, ...]
+    descriptions: Tuple[str, ...]
+
+    def to_json_list(self) -> List[Dict]:
+        """Свежий список словарей автоморфизмов (можно менять)"""
+        return [
+            {"id": i, "mapping": list(m), "name": name, "description": d}
+            for i, m, name, d in zip(self.ids, self.mappings, self.names, self.descriptions)
+        ]
+
+
+# Таблицы групп кэшируются по n как неизменяемые AutoTable; публичные
+# generate_* каждый раз собирают из них свежие списки, которые вызывающий
+# код может менять, не портя кэш.
+
+@lru_cache(maxsize=16)
+def _symmetric_autos(n: int) -> AutoTable:
+    table = _symmetric_table(n)
+    return AutoTable(
+        mappings=table,
+        ids=tuple(f"perm_{i}" for i in range(len(table))),
+        names=tuple(f"Перестановка {i + 1}" for i in range(len(table))),
+        descriptions=tuple(map(str, table)),
+    )
+
+
 def generate_symmetric_group(n: int) -> List[Dict]:
     """
     Генерирует все элементы симметрической группы S_n
@@ -35,15 +180,18 @@ def generate_symmetric_group(n: int) -> List[Dict]:
     Returns:
         Список автоморфизмов в формате игры
     """
-    automorphisms = []
-    for i, perm in enumerate(permutations(range(n))):
-        automorphisms.append({
-            "id": f"perm_{i}",
-            "mapping": list(perm),
-            "name": f"Перестановка {i + 1}",
-            "description": f"{perm}"
-        })
-    return automorphisms
+    return _symmetric_autos(n).to_json_list()
+
+
+@lru_cache(maxsize=16)
+def _alternating_autos(n: int) -> AutoTable:
+    table = _alternating_table(n)  # Только четные перестановки
+    return AutoTable(
+        mappings=table,
+        ids=tuple(f"even_perm_{i}" for i in range(len(table))),
+        names=tuple(f"Четная перестановка {i + 1}" for i in range(len(table))),
+        descriptions=tuple(map(str, table)),
+    )
 
 
 def generate_alternating_group(n: int) -> List[Dict]:
@@ -56,29 +204,34 @@ def generate_alternating_group(n: int) -> List[Dict]:
     Returns:
         Список автоморфизмов
     """
-    def sign_of_permutation(perm):
-        """Вычисляет знак перестановки"""
-        n = len(perm)
-        inversions = 0
-        for i in range(n):
-            for j in range(i + 1, n):
-                if perm[i] > perm[j]:
-                    inversions += 1
-        return 1 if inversions % 2 == 0 else -1
-
-    automorphisms = []
-    for i, perm in enumerate(permutations(range(n))):
-        if sign_of_permutation(perm) == 1:  # Только четные перестановки
-            automorphisms.append({
-                "id": f"even_perm_{len(automorphisms)}",
-                "mapping": list(perm),
-                "name": f"Четная перестановка {len(automorphisms) + 1}",
-                "description": f"{perm}"
-            })
-    return automorphisms
-
-
-def generate_dihedral_group(n: int) -> Tuple[List[Dict], List[int]]:
+    return _alternating_autos(n).to_json_list()
+
+
+@lru_cache(maxsize=16)
+def _dihedral_autos(n: int) -> AutoTable:
+    # Тождественный элемент и повороты
+    mappings = list(_rotation_table(n))
+    ids = ["e"]
+    names = ["Тождество"]
+    descriptions = ["Всё остаётся на месте"]
+
+    for k in range(1, n):
+        ids.append(f"r{k}")
+        names.append(f"Поворот на {360 * k // n}°")
+        descriptions.append(f"{k} шагов по часовой стрелке")
+
+    # Отражения s_k: i -> (k - i) % n (развёрнутый срез удвоенного range(n))
+    doubled = tuple(range(n)) * 2
+    for k in range(n):
+        mappings.append(doubled[k + n:k:-1])
+        ids.append(f"s{k}")
+        names.append(f"Отражение {k + 1}")
+        descriptions.append(f"Отразить относительно оси {k}")
+
+    return AutoTable(tuple(mappings), tuple(ids), tuple(names), tuple(descriptions))
+
+
+def generate_dihedral_group(n: int) -> Tuple[List[Dict], List[List[int]]]:
     """
     Генерирует диэдральную группу D_n (группу симметрий правильного n-угольника)
 
@@ -88,57 +241,22 @@ def generate_dihedral_group(n: int) -> Tuple[List[Dict], List[int]]:
     Returns:
         (automorphisms, positions) - автоморфизмы и позиции для рисования
     """
-    automorphisms = []
-
-    # Тождественный элемент
-    automorphisms.append({
-        "id": "e",
-        "mapping": list(range(n)),
-        "name": "Тождество",
-        "description": "Всё остаётся на месте"
-    })
-
-    # Повороты
-    for k in range(1, n):
-        mapping = [(i + k) % n for i in range(n)]
-        angle = 360 * k // n
-        automorphisms.append({
-            "id": f"r{k}",
-            "mapping": mapping,
-            "name": f"Поворот на {angle}°",
-            "description": f"{k} шагов по часовой стрелке"
-        })
-
-    # Отражения
-    for k in range(n):
-        if n % 2 == 0:  # Четное количество вершин
-            # Отражение через вершину и противоположную вершину
-            if k < n // 2:
-                mapping = [(k - i) % n for i in range(n)]
-            else:
-                mapping = [(k - i + n) % n for i in range(n)]
-        else:  # Нечетное количество вершин
-            # Отражение через вершину и середину противоположного ребра
-            mapping = [(k - i + n) % n for i in range(n)]
-
-        automorphisms.append({
-            "id": f"s{k}",
-            "mapping": mapping,
-            "name": f"Отражение {k + 1}",
-            "description": f"Отразить относительно оси {k}"
-        })
-
-    # Генерируем позиции для рисования (правильный многоугольник)
-    center_x, center_y = 640, 360
-    radius = 200
-    positions = []
-    for i in range(n):
-        angle = 2 * math.pi * i / n - math.pi / 2  # Начинаем сверху
-        x = center_x + radius * math.cos(angle)
-        y = center_y + radius * math.sin(angle)
-        positions.append([int(x), int(y)])
-
-    return automorphisms, positions
+    # Позиции для рисования (правильный многоугольник)
+    positions = [list(p) for p in _polygon_positions(n)]
+    return _dihedral_autos(n).to_json_list(), positions
+
+
+@lru_cache(maxsize=16)
+def _cyclic_autos(n: int) -> AutoTable:
+    return AutoTable(
+        mappings=_rotation_table(n),
+        ids=tuple(f"r{k}" if k > 0 else "e" for k in range(n)),
+        names=tuple("Тождество" if k == 0 else f"Сдвиг на {k}" for k in range(n)),
+        descriptions=tuple(
+            "Всё остаётся на месте" if k == 0 else f"{k} шагов циклического сдвига"
+            for k in range(n)
+        ),
+    )
 
 
 def generate_cyclic_group(n: int) -> List[Dict]:
@@ -151,16 +269,36 @@ def generate_cyclic_group(n: int) -> List[Dict]:
     Returns:
         Список автоморфизмов
     """
-    automorphisms = []
-    for k in range(n):
-        mapping = [(i + k) % n for i in range(n)]
-        automorphisms.append({
-            "id": f"r{k}" if k > 0 else "e",
-            "mapping": mapping,
-            "name": "Тождество" if k == 0 else f"Сдвиг на {k}",
-            "description": "Всё остаётся на месте" if k == 0 else f"{k} шагов циклического сдвига"
-        })
-    return automorphisms
+    return _cyclic_autos(n).to_json_list()
+
+
+# ============================================================================
+# Шаблоны уровня
+# ============================================================================
+
+# Статические части JSON уровня. _build_level_json копирует их
+# на каждый уровень, так что сами шаблоны не меняются.
+_DEFAULT_MECHANICS = {
+    "allowed_actions": ["swap"],
+    "show_cayley_button": True,
+    "show_generators_hint": False,
+    "inner_doors": [],
+    "palette": None
+}
+
+_DEFAULT_VISUALS = {
+    "background_theme": "stone_vault",
+    "ambient_particles": "dust_motes",
+    "crystal_style": "basic_gem",
+    "edge_style": "glowing"
+}
+
+_DEFAULT_HINTS = (
+    {
+        "trigger": "after_30_seconds_no_action",
+        "text": "Это сложный уровень. Попробуйте найти закономерности в структуре."
+    },
+)
 
 
 # ============================================================================
@@ -262,7 +400,7 @@ class LevelGenerator:
                     "id": i,
                     "color": color,
                     "position": positions[i],
-                    "label": chr(65 + i)  # A, B, C, D
+                    "label": _label(i)  # A, B, C, D
                 })
 
             # Рёбра с разными типами
@@ -303,7 +441,7 @@ class LevelGenerator:
                     "id": i,
                     "color": colors_config[i],
                     "position": pos,
-                    "label": chr(65 + i)
+                    "label": _label(i)
                 })
 
             # Рёбра внутри треугольников
@@ -339,136 +477,56 @@ class LevelGenerator:
 
     def _create_tetrahedron(self):
         """Создать граф тетраэдра (4 вершины, 6 рёбер)"""
-        # Позиции в форме тетраэдра
-        positions = [
-            [640, 200],   # Верхняя
-            [400, 500],   # Левая нижняя
-            [880, 500],   # Правая нижняя
-            [640, 650]    # Задняя нижняя
-        ]
-
-        colors = ["red", "blue", "green", "yellow"]
-
-        for i in range(4):
-            self.nodes.append({
-                "id": i,
-                "color": colors[i],
-                "position": positions[i],
-                "label": chr(65 + i)
-            })
+        self.nodes.extend([
+            {"id": i, "color": color, "position": list(position), "label": _label(i)}
+            for i, (color, position) in enumerate(zip(_TET_COLORS, _TET_POSITIONS))
+        ])
 
         # Полный граф на 4 вершинах
-        for i in range(4):
-            for j in range(i + 1, 4):
-                self.edges.append({
-                    "from": i,
-                    "to": j,
-                    "type": "glowing",
-                    "weight": 1
-                })
+        self.edges.extend([
+            {"from": fr, "to": to, "type": "glowing", "weight": 1}
+            for fr, to in combinations(range(4), 2)
+        ])
 
     def _create_cube(self):
         """Создать граф куба (8 вершин, 12 рёбер)"""
-        # Позиции для куба (вид сверху с перспективой)
-        positions = [
-            [400, 200], [800, 200],  # Верхняя грань
-            [800, 400], [400, 400],
-            [350, 280], [850, 280],  # Нижняя грань (со смещением для перспективы)
-            [850, 480], [350, 480]
-        ]
-
-        colors = ["red", "red", "blue", "blue", "green", "green", "yellow", "yellow"]
-
-        for i in range(8):
-            self.nodes.append({
-                "id": i,
-                "color": colors[i],
-                "position": positions[i],
-                "label": chr(65 + i)
-            })
+        self.nodes.extend([
+            {"id": i, "color": color, "position": list(position), "label": _label(i)}
+            for i, (color, position) in enumerate(zip(_CUBE_COLORS, _CUBE_POSITIONS))
+        ])
 
         # Рёбра куба
-        edges_config = [
-            # Верхняя грань
-            (0, 1), (1, 2), (2, 3), (3, 0),
-            # Нижняя грань
-            (4, 5), (5, 6), (6, 7), (7, 4),
-            # Вертикальные рёбра
-            (0, 4), (1, 5), (2, 6), (3, 7)
-        ]
-
-        for fr, to in edges_config:
-            self.edges.append({
-                "from": fr,
-                "to": to,
-                "type": "standard",
-                "weight": 1
-            })
+        self.edges.extend([
+            {"from": fr, "to": to, "type": "standard", "weight": 1}
+            for fr, to in _CUBE_EDGES
+        ])
 
     def _create_octahedron(self):
         """Создать граф октаэдра (6 вершин, 12 рёбер)"""
-        positions = [
-            [640, 150],   # Верхняя
-            [400, 300], [880, 300],  # Средний пояс (4 вершины)
-            [400, 500], [880, 500],
-            [640, 650]    # Нижняя
-        ]
-
-        colors = ["red", "blue", "blue", "green", "green", "yellow"]
-
-        for i in range(6):
-            self.nodes.append({
-                "id": i,
-                "color": colors[i],
-                "position": positions[i],
-                "label": chr(65 + i)
-            })
+        self.nodes.extend([
+            {"id": i, "color": color, "position": list(position), "label": _label(i)}
+            for i, (color, position) in enumerate(zip(_OCT_COLORS, _OCT_POSITIONS))
+        ])
 
         # Рёбра октаэдра
-        edges_config = [
-            # От верхней к поясу
-            (0, 1), (0, 2), (0, 3), (0, 4),
-            # Внутри пояса
-            (1, 2), (2, 4), (4, 3), (3, 1),
-            # От пояса к нижней
-            (1, 5), (2, 5), (3, 5), (4, 5)
-        ]
-
-        for fr, to in edges_config:
-            self.edges.append({
-                "from": fr,
-                "to": to,
-                "type": "glowing",
-                "weight": 1
-            })
+        self.edges.extend([
+            {"from": fr, "to": to, "type": "glowing", "weight": 1}
+            for fr, to in _OCT_EDGES
+        ])
 
     def _create_complete_graph(self, n: int):
         """Создать полный граф на n вершинах"""
         # Расположить вершины по кругу
-        center_x, center_y = 640, 360
-        radius = 200
-
-        for i in range(n):
-            angle = 2 * math.pi * i / n - math.pi / 2
-            x = center_x + radius * math.cos(angle)
-            y = center_y + radius * math.sin(angle)
-
-            self.nodes.append({
-                "id": i,
-                "color": COLORS[i % len(COLORS)],
-                "position": [int(x), int(y)],
-                "label": chr(65 + i)
-            })
+        self.nodes.extend([
+            {"id": i, "color": COLORS[i % len(COLORS)], "position": [x, y], "label": _label(i)}
+            for i, (x, y) in enumerate(_polygon_positions(n))
+        ])
 
         # Все рёбра
-        for i in range(n):
-            for j in range(i + 1, n):
-                self.edges.append({
-                    "from": i,
-                    "to": j,
-                    "type": "standard",
-                    "weight": 1
-                })
+        self.edges.extend([
+            {"from": fr, "to": to, "type": "standard", "weight": 1}
+            for fr, to in combinations(range(n), 2)
+        ])
 
     # ========================================================================
     # Построение JSON
@@ -496,24 +554,11 @@ class LevelGenerator:
                 "cayley_table": {}  # TODO: можно добавить автогенерацию таблицы Кэли
             },
             "mechanics": {
-                "allowed_actions": ["swap"],
-                "show_cayley_button": True,
-                "show_generators_hint": False,
-                "inner_doors": [],
-                "palette": None
+                key: list(value) if isinstance(value, list) else value
+                for key, value in _DEFAULT_MECHANICS.items()
             },
-            "visuals": {
-                "background_theme": "stone_vault",
-                "ambient_particles": "dust_motes",
-                "crystal_style": "basic_gem",
-                "edge_style": "glowing"
-            },
-            "hints": [
-                {
-                    "trigger": "after_30_seconds_no_action",
-                    "text": "Это сложный уровень. Попробуйте найти закономерности в структуре."
-                }
-            ],
+            "visuals": dict(_DEFAULT_VISUALS),
+            "hints": [dict(hint) for hint in _DEFAULT_HINTS],
             "echo_hints": []
         }
 
@@ -522,6 +567,19 @@ class LevelGenerator:
 # Примеры использования
 # ============================================================================
 
+def save_level(level: Dict, output_path: str):
+    """
+    Сохраняет уровень в JSON (indent=2, без экранирования кириллицы)
+
+    С indent json работает на чистом Python, и json.dump отдаёт в файл
+    каждый мелкий кусок отдельным write(); собранная dumps строка
+    пишется одним вызовом.
+    """
+    text = json.dumps(level, ensure_ascii=False, indent=2)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
 def main():
     """Generate example levels"""
 
@@ -538,8 +596,7 @@ def main():
     )
 
     output_path = "TheSymmetryVaults/data/levels/act1/level_13.json"
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(level13, f, ensure_ascii=False, indent=2)
+    save_level(level13, output_path)
     print(f"   [OK] Saved: {output_path}\n")
 
     # Example 2: Chaotic (D4, 8 nodes, 6 colors)
@@ -555,8 +612,7 @@ def main():
     )
 
     output_path = "TheSymmetryVaults/data/levels/act1/level_14.json"
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(level14, f, ensure_ascii=False, indent=2)
+    save_level(level14, output_path)
     print(f"   [OK] Saved: {output_path}\n")
 
     # Example 3: Alternating group A4
@@ -570,8 +626,7 @@ def main():
     )
 
     output_path = "TheSymmetryVaults/data/levels/act1/level_15.json"
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(level15, f, ensure_ascii=False, indent=2)
+    save_level(level15, output_path)
     print(f"   [OK] Saved: {output_path}\n")
 
     print("Done! Created 3 new levels.")